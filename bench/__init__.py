@@ -0,0 +1,4 @@
+"""Benchmarks for FocusFlow pages and hot helpers on synthetic data
+
+Run ``python -m bench`` from the repository root; see ``bench.__main__``.
+"""
@@ -0,0 +1,126 @@
+"""Benchmark runner
+
+    python -m bench                      # all sizes, compare with bench/baseline.json
+    python -m bench --sizes 100,10000    # a subset
+    python -m bench --update             # record the results as the new baseline
+
+Each size is generated into a temporary database and measured in its own
+interpreter, so imports and caches start cold and memory does not carry
+over. The run exits with status 1 when a metric is slower or larger than
+the baseline by more than the tolerance.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+
+from bench import data, micro, pages
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE = os.path.join(ROOT, "bench", "baseline.json")
+SIZES = [100, 1_000, 10_000, 100_000, 1_000_000]
+TOLERANCE = 0.25
+
+# Differences below these are noise whatever the ratio
+FLOORS = {"_ms": 2.0, "_us": 5.0, "_kb": 256.0, "_bytes": 4096}
+
+
+def measure(size, repeats):
+    """Populate a database of this size and benchmark it in a child interpreter"""
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        start = time.perf_counter()
+        data.populate(path, size)
+        print(f"  generated {size:,} rows in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+        env = {**os.environ, "FOCUSFLOW_DB": path, "FOCUSFLOW_USER_KEY": data.USER_KEY, "PYTHONPATH": ROOT}
+        out = subprocess.run(
+            [sys.executable, "-m", "bench", "--worker", str(repeats)],
+            cwd=ROOT, env=env, check=True, capture_output=True, text=True,
+        ).stdout
+        return json.loads(out.strip().splitlines()[-1])
+
+
+def worker(repeats):
+    path = os.environ["FOCUSFLOW_DB"]
+    print(json.dumps({"pages": pages.run(repeats), "micro": micro.run(path)}))
+
+
+def flatten(results):
+    """Return {"size/group/name/metric": value}"""
+    flat = {}
+    for size, groups in results.items():
+        for name, metrics in groups["pages"].items():
+            for metric, value in metrics.items():
+                flat[f"{size}/pages/{name}/{metric}"] = value
+        for metric, value in groups["micro"].items():
+            flat[f"{size}/micro/{metric}"] = value
+    return flat
+
+
+def regressions(current, baseline, tolerance):
+    """Return (key, baseline value, current value) for metrics beyond tolerance"""
+    found = []
+    for key, value in current.items():
+        old = baseline.get(key)
+        if old is None:
+            continue
+        floor = next((f for suffix, f in FLOORS.items() if key.endswith(suffix)), 0)
+        if value > old * (1 + tolerance) and value - old > floor:
+            found.append((key, old, value))
+    return found
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m bench", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default=",".join(map(str, SIZES)),
+                        help="comma-separated row counts (default: %(default)s)")
+    parser.add_argument("--repeats", type=int, default=5, help="warm reruns per page")
+    parser.add_argument("--baseline", default=BASELINE, help="baseline JSON file")
+    parser.add_argument("--tolerance", type=float, default=TOLERANCE,
+                        help="allowed slowdown as a fraction (default: %(default)s)")
+    parser.add_argument("--update", action="store_true", help="write the results as the baseline")
+    parser.add_argument("--worker", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.worker is not None:
+        worker(args.worker)
+        return 0
+
+    results = {}
+    for size in (int(float(s)) for s in args.sizes.split(",")):
+        print(f"size {size:,}", file=sys.stderr)
+        results[str(size)] = measure(size, args.repeats)
+        for name, metrics in results[str(size)]["pages"].items():
+            print(f"  {name:<14} " + "  ".join(f"{k}={v}" for k, v in metrics.items()), file=sys.stderr)
+        print("  micro          " + "  ".join(f"{k}={v}" for k, v in results[str(size)]["micro"].items()),
+              file=sys.stderr)
+    current = flatten(results)
+
+    if args.update or not os.path.exists(args.baseline):
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({
+                "python": platform.python_version(),
+                "machine": platform.platform(),
+                "results": current,
+            }, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"baseline written to {args.baseline}", file=sys.stderr)
+        return 0
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)["results"]
+    found = regressions(current, baseline, args.tolerance)
+    for key, old, new in found:
+        print(f"REGRESSION {key}: {old} -> {new}", file=sys.stderr)
+    if not found:
+        print(f"no regressions against {args.baseline}", file=sys.stderr)
+    return 1 if found else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
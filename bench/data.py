@@ -0,0 +1,49 @@
+"""Synthetic tasks, moods and completions"""
+import itertools
+import random
+
+from focusflow.counters import CATEGORIES, PRIORITIES
+from focusflow.storage import Store
+from focusflow.timestamps import now_minutes
+
+CHUNK = 50_000
+SPAN_DAYS = 730
+
+# The pages are driven as this user, named in a query parameter: with no
+# FOCUSFLOW_USER_KEY, AppTest's mocked client counts as remote and would
+# get an empty session partition
+USER = "bench"
+USER_PARAM = "user"
+USER_KEY = f"query:{USER_PARAM}"
+
+
+def _rows(n, seed):
+    rng = random.Random(seed)
+    end = now_minutes()
+    start = end - SPAN_DAYS * 24 * 60
+    tasks = (
+        (None, f"Task {i}", rng.choice(CATEGORIES), rng.choice(PRIORITIES),
+         rng.randrange(5, 305, 5), rng.randrange(start, end))
+        for i in range(n)
+    )
+    moods = ((rng.randrange(start, end), rng.randint(1, 10), f"note {i}") for i in range(n))
+    completed = ((f"Done {i}", rng.randrange(start, end)) for i in range(n))
+    return tasks, moods, completed
+
+
+def populate(path, n, seed=0, user=USER):
+    """Fill the user's partition at path with n tasks, n moods and n completions"""
+    store = Store(path, user)
+    try:
+        tasks, moods, completed = _rows(n, seed)
+        while True:
+            batch = {
+                "tasks": list(itertools.islice(tasks, CHUNK)),
+                "moods": list(itertools.islice(moods, CHUNK)),
+                "completed": list(itertools.islice(completed, CHUNK)),
+            }
+            if not any(batch.values()):
+                break
+            store.insert_batch(**batch)
+    finally:
+        store.close()
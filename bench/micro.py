@@ -0,0 +1,57 @@
+"""Microbenchmarks of the helpers on the rerun hot path"""
+import random
+import shutil
+import tempfile
+import time
+import timeit
+
+from bench.data import USER
+from focusflow.picker import priority_weight
+from focusflow.storage import Store
+
+REPEAT = 5
+
+
+def _per_op(fn, number):
+    """Best of REPEAT timings of fn() called number times, in microseconds per call"""
+    return round(min(timeit.repeat(fn, number=number, repeat=REPEAT)) / number * 1e6, 3)
+
+
+def run(path):
+    """Return {name: microseconds per op} measured on a copy of the database at path"""
+    results = {}
+    results["priority_weight_us"] = _per_op(lambda: priority_weight("High"), 10_000)
+
+    with tempfile.NamedTemporaryFile(suffix=".db") as copy:
+        shutil.copyfile(path, copy.name)
+        store = Store(copy.name, USER)
+        try:
+            results["load_ms"] = round(_timed(lambda: store._load()) * 1000, 2)
+
+            rng = random.Random(0)
+            results["pick_us"] = _per_op(
+                lambda: store.picker.pick("Low energy", 60, rng=rng), 2_000
+            )
+            results["sample_100_us"] = _per_op(
+                lambda: store.picker.sample(None, None, 100, rng=rng), 200
+            )
+
+            history = store.counters.completed_by_day
+            results["streak_us"] = _per_op(history.streak, 2_000)
+            results["longest_streak_us"] = _per_op(history.longest_streak, 200)
+            results["best_week_us"] = _per_op(history.best_window, 200)
+
+            ids = list(store._tasks)[:200]
+            start = time.perf_counter()
+            for task_id in ids:
+                store.complete_task(task_id)
+            results["complete_task_us"] = round((time.perf_counter() - start) / max(len(ids), 1) * 1e6, 3)
+        finally:
+            store.close()
+    return results
+
+
+def _timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
@@ -0,0 +1,59 @@
+"""Drive every page headlessly with AppTest and measure each rerun
+
+Meant to run in a fresh interpreter per data size (see bench.__main__),
+with FOCUSFLOW_DB pointing at a populated database and FOCUSFLOW_USER_KEY
+set to bench.data.USER_KEY before anything from focusflow is imported.
+"""
+import os
+import statistics
+import time
+import tracemalloc
+
+APP = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "app.py")
+TIMEOUT = 600
+
+
+def _payload_bytes(node):
+    """Serialized size of the elements the rerun produced"""
+    proto = getattr(node, "proto", None)
+    size = proto.ByteSize() if hasattr(proto, "ByteSize") else 0
+    return size + sum(_payload_bytes(child) for child in getattr(node, "children", {}).values())
+
+
+def _rerun(at):
+    start = time.perf_counter()
+    at.run()
+    elapsed = time.perf_counter() - start
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+    return elapsed * 1000
+
+
+def run(repeats=5):
+    """Return {page: {cold_ms, rerun_ms, peak_kb, payload_bytes}}"""
+    from streamlit.testing.v1 import AppTest
+
+    from bench.data import USER, USER_PARAM
+    from focusflow.ui import PAGES
+
+    results = {}
+    at = AppTest.from_file(APP, default_timeout=TIMEOUT)
+    at.query_params[USER_PARAM] = USER
+    startup_ms = _rerun(at)
+    for label in PAGES:
+        at.sidebar.radio[0].set_value(label)
+        cold = _rerun(at)
+        times = [_rerun(at) for _ in range(repeats)]
+        tracemalloc.start()
+        _rerun(at)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        name = label.split(" ", 1)[1]
+        results[name] = {
+            "cold_ms": round(cold, 2),
+            "rerun_ms": round(statistics.median(times), 2),
+            "peak_kb": round(peak / 1024, 1),
+            "payload_bytes": _payload_bytes(at._tree),
+        }
+    results["startup"] = {"cold_ms": round(startup_ms, 2)}
+    return results
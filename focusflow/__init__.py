@@ -0,0 +1 @@
+"""FocusFlow core: storage, analytics and the engine behind the Streamlit app and the CLI"""
@@ -0,0 +1,3 @@
+from focusflow.cli import main
+
+raise SystemExit(main())
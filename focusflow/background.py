@@ -0,0 +1,18 @@
+"""Shared thread pool for work taken off the script thread"""
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+MAX_WORKERS = int(os.environ.get("FOCUSFLOW_WORKERS", "2"))
+
+_executor = None
+_lock = threading.Lock()
+
+
+def submit(fn, *args):
+    """Run fn(*args) on the pool and return its Future"""
+    global _executor
+    with _lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(MAX_WORKERS, thread_name_prefix="focusflow-worker")
+    return _executor.submit(fn, *args)
@@ -0,0 +1,119 @@
+"""Bulk task entry from pasted text or CSV, validated column-wise with pandas
+
+Input is either CSV with a header row naming its columns (``name``,
+``category``/``energy``, ``priority``, ``duration``/``minutes``) or
+plain lines, one task per line, optionally followed by comma-separated
+energy, priority and duration. Missing values take the defaults chosen
+in the form. Every row is checked at once; bad rows are reported by
+line number and the rest are added in a single batch. A row matching an
+active task, or an earlier row of the same paste, on name, energy,
+priority and duration is skipped as already in the list.
+"""
+import csv
+from dataclasses import dataclass, field
+
+import pandas as pd
+
+from focusflow.counters import CATEGORIES, PRIORITIES
+from focusflow.importer import MAX_ERRORS
+from focusflow.timestamps import now_minutes
+
+COLUMNS = ["name", "category", "priority", "duration"]
+ALIASES = {
+    "task": "name",
+    "title": "name",
+    "energy": "category",
+    "energy level": "category",
+    "minutes": "duration",
+    "duration (min)": "duration",
+}
+MIN_DURATION, MAX_DURATION = 5, 300
+
+# Accepted spellings, lower-cased -> canonical value
+CATEGORY_NAMES = {**{c.lower(): c for c in CATEGORIES}, "low": "Low energy", "high": "High energy"}
+PRIORITY_NAMES = {p.lower(): p for p in PRIORITIES}
+
+
+@dataclass
+class BulkResult:
+    added: int = 0
+    duplicates: int = 0
+    skipped: int = 0
+    errors: list = field(default_factory=list)
+
+
+def read_tasks(text):
+    """Parse pasted text or CSV into a string frame with COLUMNS and a line column"""
+    lines = [(number, line) for number, line in enumerate(text.splitlines(), 1) if line.strip()]
+    rows = list(csv.reader([line for _, line in lines], skipinitialspace=True))
+    header = [ALIASES.get(h.strip().lower(), h.strip().lower()) for h in rows[0]] if rows else []
+    if "name" in header:
+        columns, rows, lines = header, rows[1:], lines[1:]
+    else:
+        # A plain list; quote names that contain commas, longer rows are taken as one name
+        columns = COLUMNS
+        rows = [row if len(row) <= len(COLUMNS) else [", ".join(row)] for row in rows]
+    width = len(columns)
+    df = pd.DataFrame([row[:width] + [""] * (width - len(row)) for row in rows], columns=columns, dtype=str)
+    df = df.loc[:, ~df.columns.duplicated()]
+    for column in COLUMNS:
+        if column not in df:
+            df[column] = ""
+    df["line"] = [number for number, _ in lines]
+    return df[COLUMNS + ["line"]]
+
+
+def validate_tasks(df, category, priority, duration):
+    """Split a read_tasks frame into (valid frame, [(line, message)])
+
+    Blank category, priority or duration cells take the given defaults.
+    """
+    df = df.copy()
+    df["name"] = df["name"].fillna("").astype(str).str.strip()
+    for column, default in (("category", category), ("priority", priority), ("duration", duration)):
+        cells = df[column].fillna("").astype(str).str.strip()
+        df[column] = cells.mask(cells == "", str(default))
+
+    df["category"] = df["category"].str.lower().map(CATEGORY_NAMES)
+    df["priority"] = df["priority"].str.lower().map(PRIORITY_NAMES)
+    minutes = pd.to_numeric(df["duration"], errors="coerce")
+
+    checks = [
+        (df["name"] == "", "name must be a non-empty string"),
+        (df["category"].isna(), f"energy must be one of {', '.join(CATEGORIES)}"),
+        (df["priority"].isna(), f"priority must be one of {', '.join(PRIORITIES)}"),
+        (~minutes.between(MIN_DURATION, MAX_DURATION) | (minutes % 1 != 0),
+         f"duration must be a whole number of minutes between {MIN_DURATION} and {MAX_DURATION}"),
+    ]
+    bad = pd.Series(False, index=df.index)
+    messages = pd.Series("", index=df.index)
+    for mask, message in checks:
+        mask = mask.fillna(True)
+        messages = messages.mask(mask & ~bad, message)
+        bad |= mask
+    errors = list(zip(df.loc[bad, "line"].tolist(), messages[bad].tolist()))
+
+    valid = df.loc[~bad, ["name", "category", "priority"]]
+    valid["duration"] = minutes[~bad].astype("int64")
+    return valid, errors
+
+
+def add_tasks(store, text, category="Low energy", priority="Medium", duration=30):
+    """Validate pasted text or CSV and add the valid tasks in one transaction"""
+    valid, errors = validate_tasks(read_tasks(text), category, priority, duration)
+    result = BulkResult(skipped=len(errors), errors=[f"line {line}: {message}" for line, message in errors[:MAX_ERRORS]])
+    if len(valid):
+        created = now_minutes()
+        with store.batch():
+            # Every row gets the same created time, so compare without it
+            active = {tuple(task[column] for column in COLUMNS) for task in store.active_tasks()}
+            rows = []
+            for row in valid.itertuples(index=False, name=None):
+                if row not in active:
+                    # Later copies of a row in the same paste are duplicates too
+                    active.add(row)
+                    rows.append((None, *row, created))
+            result.duplicates = len(valid) - len(rows)
+            if rows:
+                result.added = store.insert_batch(tasks=rows, merge=False)[0]["tasks"]
+    return result
@@ -0,0 +1,260 @@
+"""Plotly figures for the Dashboard, Mood Tracker and Analytics pages
+
+Figures are memoized in a bounded LRU keyed by chart name and the
+versions of the collections the chart reads, so a rerun that did not
+change the data reuses the previous figure instead of rebuilding it.
+"""
+import logging
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+
+from focusflow import background
+from focusflow.correlation import MoodProductivity
+from focusflow.downsample import MAX_POINTS, mood_series
+from focusflow.profiler import section
+
+RESOLUTION_LABELS = {"hour": "hourly", "day": "daily", "week": "weekly"}
+
+logger = logging.getLogger(__name__)
+
+
+def dashboard_moods(store, frames):
+    df = pd.DataFrame(store.recent_moods(7))
+    df["date"] = pd.to_datetime(df["ts"], unit="m")
+    fig = px.line(
+        df,
+        x="date",
+        y="mood",
+        title="Last 7 Days",
+        labels={"mood": "Mood", "date": "Date"}
+    )
+    fig.update_layout(
+        height=250,
+        showlegend=False,
+        margin=dict(l=0, r=0, t=30, b=0)
+    )
+    return fig
+
+
+def mood_history(store, frames, since=None, resolution="auto"):
+    """Mood from epoch minute `since` on (all time if None), at most MAX_POINTS points.
+
+    The window is an argument rather than computed from the clock, so
+    that it is part of the figure's cache key.
+    """
+    with store.db.lock:
+        # Copy, not view: a live buffer export would make the next append raise BufferError
+        ts = np.array(store.moods.ts, dtype=np.int64)
+        values = np.array(store.moods.values, dtype=np.int8)
+    resolution, columns = mood_series(
+        ts,
+        values,
+        since=since,
+        resolution=resolution,
+        max_points=MAX_POINTS,
+    )
+    dates = columns["start"].astype("datetime64[m]")
+    if resolution == "raw":
+        fig = px.line(
+            x=dates,
+            y=columns["mood"],
+            title="Your Mood Over Time",
+            labels={"y": "Mood (1-10)", "x": "Date"},
+            markers=True
+        )
+    else:
+        fig = px.line(
+            x=dates,
+            y=columns["mean"],
+            title=f"Your Mood Over Time ({RESOLUTION_LABELS[resolution]} average)",
+            labels={"y": "Mood (1-10)", "x": "Date"},
+            markers=True
+        )
+        # Shade the min-max range of each bucket behind the average
+        fig.add_scatter(x=dates, y=columns["max"], mode="lines", line=dict(width=0),
+                        showlegend=False, hoverinfo="skip")
+        fig.add_scatter(x=dates, y=columns["min"], mode="lines", line=dict(width=0),
+                        fill="tonexty", fillcolor="rgba(99, 102, 241, 0.15)",
+                        showlegend=False, hoverinfo="skip")
+    fig.update_layout(height=400, yaxis_range=[0.5, 10.5])
+    return fig
+
+
+def priority_pie(store, frames):
+    # The counters already hold these; no need to read the task table
+    priority_counts = store.counters.by_priority()
+    return px.pie(
+        values=list(priority_counts.values()),
+        names=list(priority_counts),
+        color=list(priority_counts),
+        title="Tasks by Priority",
+        color_discrete_map={"High": "#ef4444", "Medium": "#f59e0b", "Low": "#10b981"}
+    )
+
+
+def energy_bar(store, frames):
+    energy_counts = store.counters.by_category()
+    return px.bar(
+        x=list(energy_counts),
+        y=list(energy_counts.values()),
+        title="Tasks by Energy Level",
+        labels={"x": "Energy Level", "y": "Count"},
+        color_discrete_sequence=["#6366f1"]
+    )
+
+
+def daily_completions(store, frames):
+    return px.bar(
+        frames.daily_completions(),
+        x="day",
+        y="count",
+        title="Tasks Completed Per Day",
+        labels={"count": "Tasks", "day": "Date"}
+    )
+
+
+def _mood_productivity(store):
+    return store.attach("correlation", MoodProductivity)
+
+
+def mood_bands(store, frames):
+    bands = _mood_productivity(store).bands()
+    return px.bar(
+        bands,
+        x="band",
+        y="per_mood",
+        title="Tasks Completed per Mood Entry",
+        labels={"band": "Mood before completing", "per_mood": "Completions per entry"},
+        hover_data=["completions", "moods"],
+        color_discrete_sequence=["#10b981"]
+    )
+
+
+def mood_correlation(store, frames):
+    engine = _mood_productivity(store)
+    daily = engine.daily()
+    overall = engine.correlation()
+    title = "Mood vs. Completions (rolling correlation)"
+    if overall is not None:
+        title += f" · all time r = {overall:.2f}"
+    fig = px.line(
+        daily,
+        x="day",
+        y="correlation",
+        title=title,
+        labels={"day": "Date", "correlation": "Correlation"}
+    )
+    fig.update_layout(yaxis_range=[-1.05, 1.05])
+    return fig
+
+
+def hour_heatmap(store, frames):
+    engine = _mood_productivity(store)
+    completions, _ = engine.hours()
+    weekday, hour, count = engine.best_hour()
+    fig = px.imshow(
+        completions,
+        title=f"Completions by Hour · best: {weekday} {hour:02d}:00 ({count})",
+        labels={"x": "Hour of day", "y": "", "color": "Tasks"},
+        color_continuous_scale="Greens",
+        aspect="auto"
+    )
+    return fig
+
+
+# chart name -> (collections it reads, builder)
+CHARTS = {
+    "dashboard_moods": (("moods",), dashboard_moods),
+    "mood_history": (("moods",), mood_history),
+    "priority_pie": (("tasks",), priority_pie),
+    "energy_bar": (("tasks",), energy_bar),
+    "daily_completions": (("completed",), daily_completions),
+    "mood_bands": (("moods", "completed"), mood_bands),
+    "mood_correlation": (("moods", "completed"), mood_correlation),
+    "hour_heatmap": (("completed",), hour_heatmap),
+}
+
+
+class FigureCache:
+    """Bounded LRU of built figures keyed by (chart, data versions).
+
+    ``figure`` builds on the calling thread. ``figure_async`` never
+    blocks: it returns the last figure built for the chart, stale or
+    not, and rebuilds in the background when the data has changed.
+    """
+
+    def __init__(self, store, frames, maxsize=32):
+        self.store = store
+        self.frames = frames
+        self.maxsize = maxsize
+        self._lock = threading.Lock()
+        self._figures = OrderedDict()
+        self._latest = OrderedDict()  # (chart, args) -> most recently built figure, LRU too
+        self._pending = set()
+        self._errors = {}
+
+    def _key(self, name, args):
+        deps, _ = CHARTS[name]
+        return (name, tuple(self.store.versions[d] for d in deps), args)
+
+    def _cached(self, key):
+        fig = self._figures.get(key)
+        if fig is not None:
+            self._figures.move_to_end(key)
+        return fig
+
+    def _build(self, key):
+        name, _, args = key
+        with section(f"figure:{name}"):
+            fig = CHARTS[name][1](self.store, self.frames, *args)
+        with self._lock:
+            self._figures[key] = fig
+            self._latest[(name, args)] = fig
+            self._latest.move_to_end((name, args))
+            # Bounded like the figures: args hold range starts that move on every day
+            while len(self._figures) > self.maxsize:
+                self._figures.popitem(last=False)
+            while len(self._latest) > self.maxsize:
+                self._latest.popitem(last=False)
+        return fig
+
+    def figure(self, name, *args):
+        """Return the named chart, built with args if not cached for this data"""
+        key = self._key(name, args)
+        with self._lock:
+            fig = self._cached(key)
+        return fig if fig is not None else self._build(key)
+
+    def figure_async(self, name, *args):
+        """Return (figure, fresh) without waiting for a build.
+
+        figure is None until the chart has been built once; fresh is
+        False while a rebuild for the current data is in progress.
+        """
+        key = self._key(name, args)
+        with self._lock:
+            fig = self._cached(key)
+            if fig is not None:
+                return fig, True
+            error = self._errors.pop(key, None)
+            if error is not None:
+                raise error
+            if key not in self._pending:
+                self._pending.add(key)
+                background.submit(self._build_in_background, key)
+            return self._latest.get((name, args)), False
+
+    def _build_in_background(self, key):
+        try:
+            self._build(key)
+        except Exception as e:
+            logger.exception("building %s failed", key[0])
+            with self._lock:
+                self._errors[key] = e
+        finally:
+            with self._lock:
+                self._pending.discard(key)
@@ -0,0 +1,125 @@
+"""Command line interface over focusflow.engine
+
+    python -m focusflow import backup.json
+    python -m focusflow --all-users export 'backups/{user}.jsonl.gz'
+    python -m focusflow pick -n 3 --energy low --minutes 30
+    python -m focusflow plan 120
+    python -m focusflow --all-users analytics
+    python -m focusflow --db restored.db replay journal/
+
+Commands that read or change data run once per selected user (the
+default user, every --user given, or --all-users) and print one JSON
+object per user per line.
+"""
+import argparse
+import json
+import sys
+
+from focusflow import engine, journal
+from focusflow.storage import DEFAULT_DB_PATH
+
+ENERGY = {"low": "Low energy", "high": "High energy"}
+TASK_FIELDS = ("id", "name", "category", "priority", "duration")
+
+
+def _tasks(tasks):
+    return [{field: task[field] for field in TASK_FIELDS} for task in tasks]
+
+
+def _import(store, args):
+    added = {name: 0 for name in ("tasks", "moods", "completed")}
+    skipped, duplicates, errors = 0, 0, []
+    for path in args.files:
+        result = engine.import_file(store, path)
+        for name, n in result.added.items():
+            added[name] += n
+        skipped += result.skipped
+        duplicates += result.duplicates
+        errors += [f"{path}: {message}" for message in result.errors]
+    return {"added": added, "duplicates": duplicates, "skipped": skipped, "errors": errors}
+
+
+def _export(store, args):
+    path = args.file.replace("{user}", store.user or "default")
+    return {"file": path, "format": engine.export_file(store, path, args.format)}
+
+
+def _pick(store, args):
+    return {"tasks": _tasks(engine.pick(store, args.n, ENERGY.get(args.energy), args.minutes))}
+
+
+def _plan(store, args):
+    tasks = engine.plan(store, args.minutes, ENERGY.get(args.energy))
+    return {"minutes": sum(task["duration"] for task in tasks), "tasks": _tasks(tasks)}
+
+
+def _analytics(store, args):
+    return engine.analytics(store, correlation=not args.no_correlation)
+
+
+def _replay(store, args):
+    return {"events": engine.replay(store, args.directory, store.user), "tasks": store.counters.count_tasks()}
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="focusflow", description="FocusFlow without the browser")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help="SQLite file (default: %(default)s)")
+    users = parser.add_mutually_exclusive_group()
+    users.add_argument("--user", action="append", help="user id to work on; repeat for several")
+    users.add_argument("--all-users", action="store_true", help="every user with data in the database")
+    parser.add_argument("--journal", default=journal.JOURNAL_DIR, help="journal directory to log changes to")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    p = commands.add_parser("import", help="merge export files into the database")
+    p.add_argument("files", nargs="+")
+    p.set_defaults(run=_import)
+
+    p = commands.add_parser("export", help="write an export file; {user} in the name is replaced")
+    p.add_argument("file")
+    p.add_argument("--format", choices=list(engine.exporter.FORMATS), help="default: from the extension")
+    p.set_defaults(run=_export)
+
+    p = commands.add_parser("pick", help="draw tasks weighted by priority")
+    p.add_argument("-n", type=int, default=1, help="how many different tasks (default: %(default)s)")
+    p.add_argument("--energy", choices=list(ENERGY))
+    p.add_argument("--minutes", type=int, help="only tasks that fit in this many minutes")
+    p.set_defaults(run=_pick)
+
+    p = commands.add_parser("plan", help="the tasks worth the most priority within a time budget")
+    p.add_argument("minutes", type=int)
+    p.add_argument("--energy", choices=list(ENERGY))
+    p.set_defaults(run=_plan)
+
+    p = commands.add_parser("analytics", help="streaks, counts and mood/productivity figures")
+    p.add_argument("--no-correlation", action="store_true", help="skip the figures that need pandas")
+    p.set_defaults(run=_analytics)
+
+    p = commands.add_parser("replay", help="rebuild users from a journal into an empty database")
+    p.add_argument("directory")
+    p.set_defaults(run=_replay)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command == "export" and (args.all_users or len(args.user or ()) > 1) and "{user}" not in args.file:
+        print("focusflow: exporting several users needs {user} in the file name", file=sys.stderr)
+        return 2
+    # Replaying writes the journal's events back; logging them again would duplicate it
+    journal_dir = "" if args.command == "replay" else args.journal
+    status = 0
+    with engine.open_database(args.db, journal_dir) as db:
+        if args.all_users:
+            users = db.users()
+            if args.command == "replay":
+                print("focusflow: replay needs --user, the new database has no users yet", file=sys.stderr)
+                return 2
+        else:
+            users = args.user or [""]
+        for user in users:
+            try:
+                result = args.run(db.partition(user), args)
+            except (OSError, ValueError) as e:
+                result, status = {"error": str(e)}, 1
+            print(json.dumps({"user": user, **result}, ensure_ascii=False, default=str))
+    return status
@@ -0,0 +1,227 @@
+"""How mood relates to getting things done, kept up to date incrementally
+
+Each completion is matched to the latest mood logged before it, if
+that was less than ``MOOD_WINDOW`` minutes earlier (a backward
+``merge_asof``). From that join the engine keeps running totals:
+
+- completions and mood entries per mood band;
+- completions and mood sums per weekday and hour of day;
+- mood sum and count per day, for a rolling correlation with the daily
+  completion counts the store's counters already keep.
+
+New moods and completions are folded into the totals as they arrive, so
+the cost of a refresh depends on what changed, not on history length.
+Moods logged out of time order (an import of older data) or a cleared
+store trigger one full rebuild.
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+from focusflow.histogram import DayHistogram
+from focusflow.timestamps import MINUTES_PER_DAY
+
+MOOD_WINDOW = 6 * 60
+ROLLING_DAYS = 14
+BANDS = ["Low (1-3)", "Okay (4-6)", "Good (7-8)", "Great (9-10)"]
+BAND_OF = np.array([0, 0, 0, 0, 1, 1, 1, 2, 2, 3, 3])  # mood -> band index
+WEEKDAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+EPOCH_WEEKDAY = 3  # 1970-01-01 was a Thursday
+
+
+def weekday_hour(ts):
+    """Return (weekday, hour) index arrays for epoch minutes"""
+    return (ts // MINUTES_PER_DAY + EPOCH_WEEKDAY) % 7, ts % MINUTES_PER_DAY // 60
+
+
+class MoodProductivity:
+    """Materialized mood/completion aggregates for one store"""
+
+    def __init__(self, store):
+        self.store = store
+        self._lock = threading.Lock()
+        self._versions = None
+        self._derived = {}
+        # How much of the store's columns has been folded in, and their last value then
+        self._moods_seen = self._completed_seen = 0
+        self._mood_ts_last = self._completed_ts_last = None
+        self._reset()
+
+    def _reset(self):
+        self._mood_ts = np.zeros(0, dtype=np.int64)  # sorted, for matching completions
+        self._mood_values = np.zeros(0, dtype=np.int64)
+        self._last_completion = None
+        self.band_completions = np.zeros(len(BANDS), dtype=np.int64)
+        self.band_moods = np.zeros(len(BANDS), dtype=np.int64)
+        self.unmatched = 0  # completions with no mood in the window before them
+        self.hour_completions = np.zeros((7, 24), dtype=np.int64)
+        self.hour_mood_sum = np.zeros((7, 24), dtype=np.int64)
+        self.hour_mood_count = np.zeros((7, 24), dtype=np.int64)
+        self.mood_sum_by_day = DayHistogram()
+        self.mood_count_by_day = DayHistogram()
+
+    # -------------------------
+    # Maintenance
+    # -------------------------
+    def refresh(self):
+        """Fold in the moods and completions logged since the last refresh"""
+        store = self.store
+        with self._lock:
+            versions = (store.versions["moods"], store.versions["completed"])
+            if versions == self._versions:
+                return
+            with store.db.lock:
+                # Copy the new tails while no writer is appending to the columns
+                moods, completed = store.moods, store.completed
+                rebuilt = (
+                    len(moods) < self._moods_seen
+                    or len(completed) < self._completed_seen
+                    or (self._moods_seen and moods.ts[self._moods_seen - 1] != self._mood_ts_last)
+                    or (self._completed_seen and completed.ts[self._completed_seen - 1] != self._completed_ts_last)
+                )
+                start_m, start_c = (0, 0) if rebuilt else (self._moods_seen, self._completed_seen)
+                mood_ts = np.array(moods.ts[start_m:], dtype=np.int64)
+                mood_values = np.array(moods.values[start_m:], dtype=np.int64)
+                completed_ts = np.array(completed.ts[start_c:], dtype=np.int64)
+                self._moods_seen, self._completed_seen = len(moods), len(completed)
+                self._mood_ts_last = moods.ts[-1] if len(moods) else None
+                self._completed_ts_last = completed.ts[-1] if len(completed) else None
+                versions = (store.versions["moods"], store.versions["completed"])
+
+            in_order = not len(mood_ts) or (
+                bool(np.all(np.diff(mood_ts) >= 0))
+                and (not len(self._mood_ts) or mood_ts[0] >= self._mood_ts[-1])
+                # A mood logged at or after every completion cannot change their matches
+                and (self._last_completion is None or mood_ts[0] >= self._last_completion)
+            )
+            if rebuilt or not in_order:
+                self._rebuild()
+            else:
+                self._add_moods(mood_ts, mood_values)
+                self._add_completions(completed_ts)
+            self._versions = versions
+            self._derived.clear()
+
+    def _rebuild(self):
+        """Recompute every total from the store's full columns"""
+        self._reset()
+        with self.store.db.lock:
+            moods = pd.DataFrame({
+                "ts": np.array(self.store.moods.ts[:self._moods_seen], dtype=np.int64),
+                "mood": np.array(self.store.moods.values[:self._moods_seen], dtype=np.int64),
+            })
+            completed = pd.DataFrame({"ts": np.array(self.store.completed.ts[:self._completed_seen], dtype=np.int64)})
+        moods = moods.sort_values("ts", kind="stable")
+        completed = completed.sort_values("ts")
+        self._add_moods(moods["ts"].to_numpy(), moods["mood"].to_numpy())
+
+        joined = pd.merge_asof(
+            completed, moods, on="ts", direction="backward",
+            tolerance=MOOD_WINDOW - 1, allow_exact_matches=False,
+        )
+        self._count_completions(joined["ts"].to_numpy(), joined["mood"].to_numpy())
+
+    def _add_moods(self, ts, values):
+        if not len(ts):
+            return
+        self._mood_ts = np.concatenate([self._mood_ts, ts])
+        self._mood_values = np.concatenate([self._mood_values, values])
+        np.add.at(self.band_moods, BAND_OF[values], 1)
+        weekday, hour = weekday_hour(ts)
+        np.add.at(self.hour_mood_sum, (weekday, hour), values)
+        np.add.at(self.hour_mood_count, (weekday, hour), 1)
+        days, first = np.unique(ts // MINUTES_PER_DAY, return_index=True)
+        sums = np.add.reduceat(values, first)
+        counts = np.diff(np.r_[first, len(ts)])
+        for day, total, n in zip(days.tolist(), sums.tolist(), counts.tolist()):
+            self.mood_sum_by_day.add(day, total)
+            self.mood_count_by_day.add(day, n)
+
+    def _add_completions(self, ts):
+        """Match new completions to moods; the same backward as-of join, by binary search"""
+        if not len(ts):
+            return
+        i = np.searchsorted(self._mood_ts, ts, side="left") - 1
+        mood = np.full(len(ts), np.nan)
+        found = i >= 0
+        found[found] = ts[found] - self._mood_ts[i[found]] < MOOD_WINDOW
+        mood[found] = self._mood_values[i[found]]
+        self._count_completions(ts, mood)
+
+    def _count_completions(self, ts, mood):
+        if not len(ts):
+            return
+        matched = ~np.isnan(mood)
+        np.add.at(self.band_completions, BAND_OF[mood[matched].astype(np.int64)], 1)
+        self.unmatched += int((~matched).sum())
+        np.add.at(self.hour_completions, weekday_hour(ts), 1)
+        last = int(ts.max())
+        self._last_completion = last if self._last_completion is None else max(self._last_completion, last)
+
+    # -------------------------
+    # Results
+    # -------------------------
+    def _cached(self, key, build):
+        self.refresh()
+        with self._lock:
+            if key not in self._derived:
+                self._derived[key] = build()
+            return self._derived[key]
+
+    def bands(self):
+        """Return completions, mood entries and completions per entry by mood band"""
+        def build():
+            per_mood = np.divide(
+                self.band_completions, self.band_moods,
+                out=np.zeros(len(BANDS)), where=self.band_moods > 0,
+            )
+            return pd.DataFrame({
+                "band": BANDS,
+                "completions": self.band_completions.copy(),
+                "moods": self.band_moods.copy(),
+                "per_mood": per_mood.round(2),
+            })
+
+        return self._cached("bands", build)
+
+    def hours(self):
+        """Return (completions, mean mood) frames indexed by weekday, one column per hour"""
+        def build():
+            mean = np.divide(
+                self.hour_mood_sum, self.hour_mood_count,
+                out=np.full((7, 24), np.nan), where=self.hour_mood_count > 0,
+            )
+            return (
+                pd.DataFrame(self.hour_completions.copy(), index=WEEKDAYS),
+                pd.DataFrame(mean.round(1), index=WEEKDAYS),
+            )
+
+        return self._cached("hours", build)
+
+    def best_hour(self):
+        """Return (weekday, hour, completions) of the busiest hour of the week"""
+        completions, _ = self.hours()
+        weekday, hour = np.unravel_index(np.argmax(completions.to_numpy()), (7, 24))
+        return WEEKDAYS[weekday], int(hour), int(completions.iat[weekday, hour])
+
+    def daily(self, window=ROLLING_DAYS):
+        """Return the days with moods: mean mood, completions and their rolling correlation"""
+        def build():
+            days, counts = self.mood_count_by_day.active_days()
+            df = pd.DataFrame({
+                "day": days.astype("datetime64[D]"),
+                "mood": self.mood_sum_by_day.values(days) / np.maximum(counts, 1),
+                "completions": self.store.counters.completed_by_day.values(days),
+            })
+            df["correlation"] = df["mood"].rolling(window, min_periods=max(3, window // 2)).corr(df["completions"])
+            return df
+
+        return self._cached(("daily", window), build)
+
+    def correlation(self):
+        """Return the correlation of daily mean mood and completions over all time, or None"""
+        df = self.daily()
+        if len(df) < 3 or df["mood"].std() == 0 or df["completions"].std() == 0:
+            return None
+        return float(df["mood"].corr(df["completions"]))
@@ -0,0 +1,85 @@
+"""Incrementally maintained totals for the Quick Stats and Dashboard metrics"""
+import threading
+from collections import Counter
+
+from focusflow.histogram import DayHistogram
+from focusflow.timestamps import day_of, day_number, today
+
+PRIORITIES = ["Low", "Medium", "High"]
+CATEGORIES = ["Low energy", "High energy"]
+
+
+class Counters:
+    """Running counts kept in step with every store mutation.
+
+    Every read is O(1) regardless of history length. The store seeds the
+    counters from the rows it reads into memory when it loads (it walks
+    the tasks and completions anyway for its indexes and time columns)
+    and updates them on each write.
+    Reads take ``lock``, the store's write lock, so they never see a
+    write half done.
+    """
+
+    def __init__(self, lock=None):
+        self.lock = threading.RLock() if lock is None else lock
+        self.tasks = Counter()  # (priority, category) -> active tasks
+        self.completed_by_day = DayHistogram()  # epoch day -> completions
+        self.completed_total = 0
+        self.mood_sum = 0
+        self.mood_count = 0
+
+    # -------------------------
+    # Updates
+    # -------------------------
+    def task_added(self, priority, category, n=1):
+        self.tasks[(priority, category)] += n
+
+    def task_removed(self, priority, category, n=1):
+        self.tasks[(priority, category)] -= n
+
+    def task_completed(self, ts, n=1):
+        self.completed_by_day.add(day_of(ts), n)
+        self.completed_total += n
+
+    def mood_logged(self, mood, n=1, total=None):
+        """Record n moods; pass their total when n > 1"""
+        self.mood_sum += mood if total is None else total
+        self.mood_count += n
+
+    def reset(self):
+        self.__init__(self.lock)
+
+    # -------------------------
+    # Reads
+    # -------------------------
+    def count_tasks(self, priorities=None, category=None):
+        """Count active tasks matching the priority and category filters"""
+        with self.lock:
+            return sum(
+                n for (priority, cat), n in self.tasks.items()
+                if (priorities is None or priority in priorities)
+                and (category is None or cat == category)
+            )
+
+    def by_priority(self):
+        with self.lock:
+            return {p: self.count_tasks(priorities=[p]) for p in PRIORITIES}
+
+    def by_category(self):
+        with self.lock:
+            return {c: self.count_tasks(category=c) for c in CATEGORIES}
+
+    def completed_on(self, d):
+        with self.lock:
+            return self.completed_by_day[day_number(d)]
+
+    def completed_today(self):
+        with self.lock:
+            return self.completed_by_day[today()]
+
+    def average_mood(self):
+        """Return the mean mood rounded to one decimal, or 0 with no moods"""
+        with self.lock:
+            if not self.mood_count:
+                return 0
+            return round(self.mood_sum / self.mood_count, 1)
@@ -0,0 +1,115 @@
+"""Time-bucketed aggregation and LTTB downsampling for mood charts
+
+Charts never send more than a fixed number of points to the browser:
+long ranges are aggregated into hourly, daily or weekly buckets (mean,
+min, max, count), and the raw view is thinned with Largest-Triangle-
+Three-Buckets so the shape of the series survives.
+"""
+import numpy as np
+
+from focusflow.timestamps import MINUTES_PER_DAY
+
+MAX_POINTS = 500
+
+# resolution -> bucket width in minutes
+RESOLUTIONS = {
+    "hour": 60,
+    "day": MINUTES_PER_DAY,
+    "week": 7 * MINUTES_PER_DAY,
+}
+
+# Epoch day 0 (1970-01-01) was a Thursday; shift so weeks start on Monday
+WEEK_OFFSET = 3 * MINUTES_PER_DAY
+
+
+def choose_resolution(ts, max_points=MAX_POINTS):
+    """Return "raw" or the finest bucket size that fits within max_points"""
+    if len(ts) <= max_points:
+        return "raw"
+    span = int(ts.max()) - int(ts.min()) + 1
+    for resolution, width in RESOLUTIONS.items():
+        if span // width + 1 <= max_points:
+            return resolution
+    return "week"
+
+
+def bucket(ts, values, resolution):
+    """Aggregate values into time buckets.
+
+    Returns a dict of equal-length arrays: start (epoch minutes of each
+    bucket), mean, min, max and count. Buckets without data are omitted.
+    """
+    width = RESOLUTIONS[resolution]
+    offset = WEEK_OFFSET if resolution == "week" else 0
+    if not len(ts):
+        empty = np.array([], dtype=np.float64)
+        return {"start": empty.astype(np.int64), "mean": empty, "min": empty, "max": empty,
+                "count": empty.astype(np.int64)}
+    keys = (ts + offset) // width
+    order = np.argsort(keys, kind="stable")
+    keys = keys[order]
+    values = values[order].astype(np.float64)
+    starts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    counts = np.diff(np.r_[starts, len(keys)])
+    return {
+        "start": keys[starts] * width - offset,
+        "mean": np.add.reduceat(values, starts) / counts,
+        "min": np.minimum.reduceat(values, starts),
+        "max": np.maximum.reduceat(values, starts),
+        "count": counts,
+    }
+
+
+def lttb(x, y, threshold=MAX_POINTS):
+    """Return indices of the points kept by Largest-Triangle-Three-Buckets"""
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = x.astype(np.float64)
+    y = y.astype(np.float64)
+    # Interior points are split into threshold - 2 buckets
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    keep = np.empty(threshold, dtype=np.int64)
+    keep[0], keep[-1] = 0, n - 1
+    a = 0
+    for i in range(threshold - 2):
+        lo, hi = edges[i], edges[i + 1]
+        if i + 2 < len(edges):
+            nlo, nhi = edges[i + 1], edges[i + 2]
+            avg_x, avg_y = x[nlo:nhi].mean(), y[nlo:nhi].mean()
+        else:
+            avg_x, avg_y = x[-1], y[-1]
+        area = np.abs(
+            (x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a])
+        )
+        a = lo + int(np.argmax(area))
+        keep[i + 1] = a
+    return keep
+
+
+def mood_series(ts, values, since=None, resolution="auto", max_points=MAX_POINTS):
+    """Prepare a mood series for plotting.
+
+    ts and values are array-likes of epoch minutes and moods; since drops
+    entries before that minute. Returns (resolution, columns) where
+    columns holds start/mean/min/max/count for bucketed views, or
+    start/mood for the raw view; either is LTTB-thinned to max_points.
+    """
+    ts = np.asarray(ts, dtype=np.int64)
+    values = np.asarray(values, dtype=np.int64)
+    if since is not None:
+        mask = ts >= since
+        ts, values = ts[mask], values[mask]
+    if resolution == "auto":
+        resolution = choose_resolution(ts, max_points) if len(ts) else "raw"
+    if resolution == "raw":
+        order = np.argsort(ts, kind="stable")
+        ts, values = ts[order], values[order]
+        keep = lttb(ts, values, max_points)
+        return resolution, {"start": ts[keep], "mood": values[keep]}
+    columns = bucket(ts, values, resolution)
+    if len(columns["start"]) > max_points:
+        # Still too many buckets for this range: thin them like the raw view
+        keep = lttb(columns["start"], columns["mean"], max_points)
+        columns = {name: column[keep] for name, column in columns.items()}
+    return resolution, columns
@@ -0,0 +1,123 @@
+"""Streamlit-free entry points for scripts, batch jobs and the CLI
+
+Everything under ``focusflow`` except ``focusflow.ui`` runs without
+Streamlit; this module gathers the operations a script needs on top of
+``Database`` and ``Store``::
+
+    from focusflow import engine
+
+    with engine.open_database("focusflow.db") as db:
+        for user in db.users():
+            store = db.partition(user)
+            engine.import_file(store, "tasks.jsonl.gz")
+            print(engine.pick(store, 3, category="Low energy"))
+            print(engine.analytics(store))
+"""
+import os
+import random
+from contextlib import contextmanager
+
+from focusflow import exporter, importer, journal
+from focusflow.storage import DEFAULT_DB_PATH, Database
+from focusflow.timestamps import day_to_date, format_minutes, today
+
+# file name ending -> export format
+EXTENSIONS = {ext: fmt for fmt, (ext, _) in exporter.FORMATS.items()}
+
+
+@contextmanager
+def open_database(path=DEFAULT_DB_PATH, journal_dir=journal.JOURNAL_DIR):
+    """Open a database for the length of a with block"""
+    db = Database(path, journal_dir=journal_dir)
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def format_for(path):
+    """Return the export format named by a file's extension"""
+    name = os.path.basename(path).lower()
+    for ext in sorted(EXTENSIONS, key=len, reverse=True):
+        if name.endswith("." + ext):
+            return EXTENSIONS[ext]
+    raise ValueError(f"Cannot tell the format of {path}; use one of: {', '.join(EXTENSIONS)}")
+
+
+def import_file(store, path):
+    """Merge an export file into the store and return the ImportResult"""
+    with open(path, "rb") as f:
+        return importer.import_stream(store, f)
+
+
+def export_file(store, path, fmt=None):
+    """Write the store to path, in the format its extension names unless fmt is given"""
+    fmt = fmt or format_for(path)
+    with open(path, "wb") as out:
+        exporter.write_export(store, fmt, out)
+    return fmt
+
+
+def pick(store, k=1, category=None, max_duration=None, rng=random):
+    """Return up to k different active tasks, drawn weighted by priority"""
+    ids = store.picker.sample_distinct(k, category, max_duration, rng)
+    return [store.get_task(task_id) for task_id in ids]
+
+
+def plan(store, minutes, category=None):
+    """Return the tasks worth the most priority that fit in minutes"""
+    from focusflow.planner import Planner
+
+    return [store.get_task(task_id) for task_id in store.attach("planner", Planner).plan(minutes, category).task_ids]
+
+
+def _day(day):
+    return None if day is None else day_to_date(day).isoformat()
+
+
+def analytics(store, correlation=True):
+    """Return the dashboard and analytics figures as a JSON-ready dict.
+
+    correlation adds the mood/productivity figures, which need pandas.
+    """
+    counters = store.counters
+    history = counters.completed_by_day
+    best_day, best_day_count = history.best_day()
+    best_week, best_week_count = history.best_window(7)
+    longest_start, longest = history.longest_streak()
+    result = {
+        "active_tasks": counters.count_tasks(),
+        "by_priority": counters.by_priority(),
+        "by_energy": counters.by_category(),
+        "completed_total": counters.completed_total,
+        "completed_today": counters.completed_today(),
+        "current_streak": history.streak(today()),
+        "longest_streak": {"start": _day(longest_start), "days": longest},
+        "best_day": {"date": _day(best_day), "count": best_day_count},
+        "best_week": {"start": _day(best_week), "count": best_week_count},
+        "mood_count": counters.mood_count,
+        "average_mood": counters.average_mood(),
+        "last_completed": format_minutes(store.completed.ts[-1]) if len(store.completed) else None,
+    }
+    if correlation and counters.completed_total:
+        from focusflow.correlation import MoodProductivity
+
+        engine = store.attach("correlation", MoodProductivity)
+        weekday, hour, count = engine.best_hour()
+        result["best_hour"] = {"weekday": weekday, "hour": hour, "count": count}
+        if counters.mood_count:
+            result["mood_bands"] = engine.bands().to_dict("records")
+            result["mood_correlation"] = engine.correlation()
+    return result
+
+
+def replay(store, directory, user=""):
+    """Rebuild a user's data from a journal directory into an empty store"""
+    if store.counters.count_tasks() or store.counters.completed_total or store.counters.mood_count:
+        raise ValueError("Replay needs an empty store; use a new database file")
+    # Read-only: replaying must not touch the source, not even to cut off a torn record
+    source = journal.Journal(directory, user, readonly=True)
+    try:
+        return journal.restore(store, source)
+    finally:
+        source.close()
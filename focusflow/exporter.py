@@ -0,0 +1,149 @@
+"""Export formats for the sidebar download and nightly backups
+
+Every format is written incrementally from ``Store.iter_export`` into a
+binary file, so the rows are never all held as Python objects; the
+sidebar download gets the encoded bytes. All of them can be read back by
+``focusflow.importer``.
+"""
+import gzip
+import importlib.util
+import io
+import itertools
+import json
+from datetime import datetime
+
+from focusflow.importer import KINDS
+from focusflow.timestamps import DATE_FORMAT, format_minutes
+
+# label -> (file extension, MIME type)
+FORMATS = {
+    "JSON": ("json", "application/json"),
+    "JSON Lines": ("jsonl", "application/x-ndjson"),
+    "JSON Lines (gzip)": ("jsonl.gz", "application/gzip"),
+    "Parquet": ("parquet", "application/vnd.apache.parquet"),
+}
+
+PARQUET_BATCH = 50_000
+
+# collection -> (opening text, record indent, closing text) of the JSON layout
+JSON_SECTIONS = {
+    "tasks": ('{\n  "tasks": [', "    ", "\n  ]"),
+    "moods": (',\n  "moods": [', "    ", "\n  ]"),
+    "completed": (',\n  "stats": {\n    "completed": [', "      ", "\n    ]"),
+}
+
+
+def available_formats():
+    """Return the format labels usable here; Parquet needs pyarrow"""
+    formats = list(FORMATS)
+    if importlib.util.find_spec("pyarrow") is None:
+        formats.remove("Parquet")
+    return formats
+
+
+def file_name(fmt, when=None):
+    when = when or datetime.now()
+    return f"focusflow_data_{when.strftime('%Y%m%d')}.{FORMATS[fmt][0]}"
+
+
+def export_record(collection, row):
+    """Convert a stored row to the export layout with string dates"""
+    if collection == "tasks":
+        return {**row, "created": format_minutes(row["created"])}
+    if collection == "moods":
+        return {"date": format_minutes(row["ts"]), "mood": row["mood"], "note": row["note"]}
+    return {"name": row["name"], "date": format_minutes(row["ts"])}
+
+
+# -------------------------
+# Writers
+# -------------------------
+def _write_json(rows, out, exported_at):
+    """The original indented layout, written one record at a time"""
+    text = io.TextIOWrapper(out, encoding="utf-8", write_through=True)
+    groups = itertools.groupby(rows, key=lambda item: item[0])
+    group = next(groups, None)
+    for collection, (opening, indent, closing) in JSON_SECTIONS.items():
+        text.write(opening)
+        empty = True
+        if group is not None and group[0] == collection:
+            for _, row in group[1]:
+                record = json.dumps(export_record(collection, row), indent=2)
+                text.write(("\n" if empty else ",\n") + indent + record.replace("\n", "\n" + indent))
+                empty = False
+            group = next(groups, None)
+        text.write("]" if empty else closing)
+    text.write(f',\n    "total_time": 0\n  }},\n  "exported_at": {json.dumps(exported_at)}\n}}')
+    text.detach()
+
+
+def _write_jsonl(rows, out, exported_at):
+    """One compact record per line, tagged with its kind"""
+    text = io.TextIOWrapper(out, encoding="utf-8", write_through=True)
+    text.write(json.dumps({"kind": "meta", "exported_at": exported_at}) + "\n")
+    for collection, row in rows:
+        record = {"kind": KINDS[collection], **export_record(collection, row)}
+        text.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+    text.detach()
+
+
+def _write_jsonl_gz(rows, out, exported_at):
+    with gzip.GzipFile(fileobj=out, mode="wb", compresslevel=6) as gz:
+        _write_jsonl(rows, gz, exported_at)
+
+
+def _write_parquet(rows, out, exported_at):
+    """A single columnar table with a kind column; unused fields are null"""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([
+        ("kind", pa.dictionary(pa.int8(), pa.string())),
+        ("id", pa.int64()),
+        ("name", pa.string()),
+        ("category", pa.dictionary(pa.int8(), pa.string())),
+        ("priority", pa.dictionary(pa.int8(), pa.string())),
+        ("duration", pa.int16()),
+        ("created", pa.timestamp("s")),
+        ("date", pa.timestamp("s")),
+        ("mood", pa.int8()),
+        ("note", pa.string()),
+    ], metadata={"exported_at": exported_at})
+    writer = pq.ParquetWriter(out, schema, compression="zstd")
+    rows = iter(rows)
+    while batch := list(itertools.islice(rows, PARQUET_BATCH)):
+        columns = {name: [] for name in schema.names}
+        for collection, row in batch:
+            columns["kind"].append(KINDS[collection])
+            columns["id"].append(row.get("id"))
+            columns["name"].append(row.get("name"))
+            columns["category"].append(row.get("category"))
+            columns["priority"].append(row.get("priority"))
+            columns["duration"].append(row.get("duration"))
+            columns["created"].append(row["created"] * 60 if "created" in row else None)
+            columns["date"].append(row["ts"] * 60 if "ts" in row else None)
+            columns["mood"].append(row.get("mood"))
+            columns["note"].append(row.get("note"))
+        writer.write_table(pa.table(columns, schema=schema))
+    writer.close()
+
+
+WRITERS = {
+    "JSON": _write_json,
+    "JSON Lines": _write_jsonl,
+    "JSON Lines (gzip)": _write_jsonl_gz,
+    "Parquet": _write_parquet,
+}
+
+
+def write_export(store, fmt, out, rows=None):
+    """Write every stored row (or the given iter_export rows) to the binary file out"""
+    rows = store.iter_export() if rows is None else rows
+    WRITERS[fmt](rows, out, datetime.now().strftime(DATE_FORMAT))
+
+
+def export_file(store, fmt):
+    """Return the export as bytes, the type st.download_button accepts"""
+    out = io.BytesIO()
+    write_export(store, fmt, out)
+    return out.getvalue()
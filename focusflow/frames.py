@@ -0,0 +1,33 @@
+"""Versioned DataFrames shared by the Analytics charts and metrics"""
+import pandas as pd
+
+
+class FrameCache:
+    """Aggregates derived from the store, keyed by its mutation counters.
+
+    ``_cached`` rebuilds a value only when ``store.versions`` has moved
+    on for the collection it was computed from.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self._derived = {}
+
+    def _cached(self, name, key, build):
+        version = self.store.versions[name]
+        cached = self._derived.get((name, key))
+        if cached is None or cached[0] != version:
+            cached = (version, build())
+            self._derived[(name, key)] = cached
+        return cached[1]
+
+    # -------------------------
+    # Shared aggregates
+    # -------------------------
+    def daily_completions(self):
+        """Return a day/count frame of the days with completions"""
+        def build():
+            days, counts = self.store.counters.completed_by_day.active_days()
+            return pd.DataFrame({"day": pd.Series(days.astype("datetime64[D]")).dt.date, "count": counts})
+
+        return self._cached("completed", "daily", build)
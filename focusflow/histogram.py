@@ -0,0 +1,114 @@
+"""Completions per calendar day as a dense NumPy array
+
+Index i of the array holds the count for epoch day ``origin + i``.
+Recording a completion is an O(1) increment (amortized, the array grows
+by doubling), and streaks, best day and best week are vectorized reads
+over the array instead of rescans of the completion history.
+"""
+import numpy as np
+
+from focusflow.timestamps import today
+
+INITIAL_DAYS = 64
+
+
+class DayHistogram:
+    """Dense per-day counts over the span of recorded days"""
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.origin = None
+        self.counts = np.zeros(0, dtype=np.int64)
+        self.end = 0  # days in use, counts[:end]
+
+    def __len__(self):
+        return self.end
+
+    def _fit(self, day):
+        """Grow the array so day has a slot; return its index"""
+        if self.origin is None:
+            self.origin = day
+            self.counts = np.zeros(INITIAL_DAYS, dtype=np.int64)
+        if day < self.origin:
+            shift = self.origin - day
+            counts = np.zeros(max(len(self.counts), self.end + shift) * 2, dtype=np.int64)
+            counts[shift:shift + self.end] = self.counts[:self.end]
+            self.counts, self.origin, self.end = counts, day, self.end + shift
+        i = day - self.origin
+        if i >= len(self.counts):
+            counts = np.zeros(max(len(self.counts) * 2, i + 1), dtype=np.int64)
+            counts[:self.end] = self.counts[:self.end]
+            self.counts = counts
+        self.end = max(self.end, i + 1)
+        return i
+
+    def add(self, day, n=1):
+        i = self._fit(day)
+        self.counts[i] += n
+
+    def __getitem__(self, day):
+        if self.origin is None or not 0 <= day - self.origin < self.end:
+            return 0
+        return int(self.counts[day - self.origin])
+
+    def values(self, days):
+        """Return the counts for an array of days, vectorized __getitem__"""
+        days = np.asarray(days, dtype=np.int64)
+        if self.origin is None:
+            return np.zeros(len(days), dtype=np.int64)
+        i = days - self.origin
+        inside = (i >= 0) & (i < self.end)
+        out = np.zeros(len(days), dtype=np.int64)
+        out[inside] = self.counts[i[inside]]
+        return out
+
+    def active_days(self):
+        """Return (days, counts) arrays for the days with completions"""
+        if self.origin is None:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        counts = self.counts[:self.end]
+        idx = np.flatnonzero(counts)
+        return idx + self.origin, counts[idx]
+
+    # -------------------------
+    # Streaks and records
+    # -------------------------
+    def streak(self, as_of=None):
+        """Consecutive days with completions ending on as_of (default today)"""
+        as_of = today() if as_of is None else as_of
+        if self.origin is None or not 0 <= as_of - self.origin < self.end:
+            return 0
+        active = self.counts[:as_of - self.origin + 1] > 0
+        gaps = np.flatnonzero(~active)
+        return len(active) - (int(gaps[-1]) + 1 if len(gaps) else 0)
+
+    def longest_streak(self):
+        """Return (first day, length) of the longest run of active days"""
+        if self.origin is None:
+            return None, 0
+        active = np.r_[False, self.counts[:self.end] > 0, False].astype(np.int8)
+        edges = np.diff(active)
+        starts, stops = np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+        if not len(starts):
+            return None, 0
+        i = int(np.argmax(stops - starts))
+        return int(starts[i]) + self.origin, int(stops[i] - starts[i])
+
+    def best_day(self):
+        """Return (day, count) of the day with most completions"""
+        if not self.end:
+            return None, 0
+        i = int(np.argmax(self.counts[:self.end]))
+        return i + self.origin, int(self.counts[i])
+
+    def best_window(self, days=7):
+        """Return (first day, total) of the busiest run of `days` consecutive days"""
+        if not self.end:
+            return None, 0
+        sums = np.cumsum(np.r_[0, self.counts[:self.end]])
+        width = min(days, self.end)
+        totals = sums[width:] - sums[:-width]
+        i = int(np.argmax(totals))
+        return i + self.origin, int(totals[i])
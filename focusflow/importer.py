@@ -0,0 +1,362 @@
+"""Streaming import of FocusFlow exports
+
+Exports are read record by record, so a multi-hundred-MB file never
+exists as one parsed document. The layouts written by
+``focusflow.exporter`` are accepted:
+
+- the JSON export (``{"tasks": [...], "moods": [...], "stats":
+  {"completed": [...]}}``), walked with an incremental parser that only
+  materialises one array element at a time;
+- JSON Lines, one record per line with a ``kind`` of ``task``, ``mood``
+  or ``completed`` (``meta`` lines are ignored), optionally gzipped;
+- Parquet, read one record batch at a time (needs pyarrow).
+
+Every record is validated before it is batch-inserted and merged into
+the existing data.
+"""
+import codecs
+import gzip
+import json
+import zlib
+from dataclasses import dataclass, field
+from datetime import datetime
+
+from focusflow.counters import CATEGORIES, PRIORITIES
+from focusflow.timestamps import parse, to_minutes
+
+CHUNK_SIZE = 1 << 16
+MAX_VALUE = 16 << 20  # longest JSON value (record) buffered before giving up on it
+MAX_LINE = 1 << 20  # how far to look for the end of the first line
+BATCH_SIZE = 5000
+MAX_ERRORS = 50
+
+KINDS = {"tasks": "task", "moods": "mood", "completed": "completed"}
+
+
+# -------------------------
+# Validation
+# -------------------------
+def _timestamp(value, field_name):
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    if isinstance(value, datetime):
+        return to_minutes(value)
+    if isinstance(value, str):
+        try:
+            return parse(value)
+        except ValueError:
+            pass
+    raise ValueError(f"{field_name} must be a \"YYYY-MM-DD HH:MM\" date")
+
+
+def _name(value, field_name="name"):
+    if not isinstance(value, str) or not value.strip():
+        raise ValueError(f"{field_name} must be a non-empty string")
+    return value.strip()
+
+
+def validate_task(record):
+    """Return (id, name, category, priority, duration, created) or raise ValueError"""
+    name = _name(record.get("name"))
+    if record.get("category") not in CATEGORIES:
+        raise ValueError(f"category must be one of {', '.join(CATEGORIES)}")
+    if record.get("priority") not in PRIORITIES:
+        raise ValueError(f"priority must be one of {', '.join(PRIORITIES)}")
+    duration = record.get("duration")
+    if isinstance(duration, bool) or not isinstance(duration, (int, float)) or not 5 <= duration <= 300:
+        raise ValueError("duration must be a number of minutes between 5 and 300")
+    created = record.get("created")
+    created = None if created in (None, "") else _timestamp(created, "created")
+    return record.get("id"), name, record["category"], record["priority"], int(duration), created
+
+
+def validate_mood(record):
+    """Return (ts, mood, note) or raise ValueError"""
+    mood = record.get("mood")
+    if isinstance(mood, bool) or not isinstance(mood, int) or not 1 <= mood <= 10:
+        raise ValueError("mood must be an integer from 1 to 10")
+    note = record.get("note") or ""
+    if not isinstance(note, str):
+        raise ValueError("note must be a string")
+    return _timestamp(record.get("date"), "date"), mood, note
+
+
+def validate_completed(record):
+    """Return (name, ts) or raise ValueError"""
+    return _name(record.get("name")), _timestamp(record.get("date"), "date")
+
+
+VALIDATORS = {
+    "tasks": validate_task,
+    "moods": validate_mood,
+    "completed": validate_completed,
+}
+
+
+# -------------------------
+# Incremental JSON reader
+# -------------------------
+class _JSONStream:
+    """Pull parser over a text stream that decodes one value at a time"""
+
+    def __init__(self, read_text):
+        self._read = read_text
+        self._decoder = json.JSONDecoder()
+        self.buf = ""
+        self.pos = 0
+        self.offset = 0  # characters dropped from the front of buf
+        self.eof = False
+
+    def _fill(self):
+        chunk = self._read()
+        if not chunk:
+            self.eof = True
+            return False
+        self.offset += self.pos
+        self.buf = self.buf[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Return the next non-whitespace character without consuming it"""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in " \t\r\n":
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char):
+        if self.peek() != char:
+            raise ValueError(f"Invalid file format: expected {char!r} near offset {self.offset + self.pos}")
+        self.pos += 1
+
+    def accept(self, char):
+        if self.peek() == char:
+            self.pos += 1
+            return True
+        return False
+
+    def value(self):
+        """Decode and return the next complete JSON value"""
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError as e:
+                # Only an error where the buffer ends (or a string running past it) may be a
+                # value cut by the chunk boundary; anything else will not go away by reading on
+                cut = e.pos >= len(self.buf) - 8 or e.msg.startswith("Unterminated string")
+                if not cut or len(self.buf) - self.pos > MAX_VALUE:
+                    raise ValueError(f"Invalid file format: {e.msg} near offset {self.offset + e.pos}") from e
+                if not self._fill():
+                    if self.buf[e.pos:].strip() and not e.msg.startswith("Unterminated string"):
+                        raise ValueError(f"Invalid file format: {e.msg} near offset {self.offset + e.pos}") from e
+                    raise ValueError("Invalid file format: truncated JSON") from e
+                continue
+            # A number ending exactly at the buffer edge may continue in the next chunk
+            if end == len(self.buf) and not self.eof and self._fill():
+                continue
+            self.pos = end
+            return value
+
+    def first_line_is_value(self):
+        """Whether the first line holds exactly one complete JSON value"""
+        while "\n" not in self.buf[self.pos:] and len(self.buf) - self.pos < MAX_LINE and self._fill():
+            pass
+        end = self.buf.find("\n", self.pos)
+        line = self.buf[self.pos:] if end < 0 else self.buf[self.pos:end]
+        try:
+            _, value_end = self._decoder.raw_decode(line)
+        except json.JSONDecodeError:
+            return False
+        return not line[value_end:].strip()
+
+    def items(self):
+        """Yield the keys of an object; the caller consumes each value"""
+        self.expect("{")
+        if self.accept("}"):
+            return
+        while True:
+            key = self.value()
+            self.expect(":")
+            yield key
+            if self.accept("}"):
+                return
+            self.expect(",")
+
+    def elements(self):
+        """Yield the elements of an array one at a time"""
+        self.expect("[")
+        if self.accept("]"):
+            return
+        while True:
+            yield self.value()
+            if self.accept("]"):
+                return
+            self.expect(",")
+
+
+def _iter_document(stream):
+    yield from _iter_sections(stream)
+    if stream.peek():
+        raise ValueError(f"Invalid file format: unexpected data after document near offset {stream.offset + stream.pos}")
+
+
+def _iter_sections(stream):
+    for key in stream.items():
+        if key in ("tasks", "moods"):
+            for record in stream.elements():
+                yield key, record
+        elif key == "stats" and stream.peek() == "{":
+            for stats_key in stream.items():
+                if stats_key == "completed":
+                    for record in stream.elements():
+                        yield "completed", record
+                else:
+                    stream.value()
+        else:
+            stream.value()
+
+
+def _iter_parsed_document(doc):
+    """The records of a JSON export already parsed as a whole (it fit on one line)"""
+    for key in ("tasks", "moods"):
+        for record in doc.get(key) or ():
+            yield key, record
+    stats = doc.get("stats")
+    for record in (stats.get("completed") or () if isinstance(stats, dict) else ()):
+        yield "completed", record
+
+
+def _iter_lines(stream):
+    collections = {kind: name for name, kind in KINDS.items()}
+    first = True
+    while stream.peek():
+        record = stream.value()
+        if first and isinstance(record, dict) and "kind" not in record and {"tasks", "moods", "stats"} & record.keys():
+            # A whole export written on one line
+            yield from _iter_parsed_document(record)
+            if stream.peek():
+                raise ValueError("Invalid file format: unexpected data after document")
+            return
+        first = False
+        if isinstance(record, dict) and record.get("kind") == "meta":
+            continue
+        if not isinstance(record, dict) or record.get("kind") not in collections:
+            yield None, record
+        else:
+            yield collections[record["kind"]], record
+
+
+def _iter_text(fileobj):
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+
+    def read_text():
+        # A chunk ending inside a multi-byte character decodes to "", which is not the end
+        while True:
+            data = fileobj.read(CHUNK_SIZE)
+            text = decoder.decode(data, final=not data)
+            if text or not data:
+                return text
+
+    stream = _JSONStream(read_text)
+    if stream.peek() == "{" and not stream.first_line_is_value():
+        # The JSON export spans lines; a JSON Lines file has a whole record on its first
+        yield from _iter_document(stream)
+        return
+    yield from _iter_lines(stream)
+
+
+def _iter_parquet(fileobj):
+    import pyarrow.parquet as pq
+
+    collections = {kind: name for name, kind in KINDS.items()}
+    for batch in pq.ParquetFile(fileobj).iter_batches(batch_size=BATCH_SIZE):
+        for record in batch.to_pylist():
+            yield collections.get(record.get("kind")), record
+
+
+def iter_records(fileobj):
+    """Yield (collection, record) pairs from a seekable binary export file"""
+    magic = fileobj.read(4)
+    fileobj.seek(0)
+    if magic[:2] == b"\x1f\x8b":
+        try:
+            yield from _iter_text(gzip.GzipFile(fileobj=fileobj, mode="rb"))
+        except (EOFError, OSError, zlib.error) as e:
+            raise ValueError("Invalid file format: the gzip file is truncated or corrupt") from e
+    elif magic == b"PAR1":
+        yield from _iter_parquet(fileobj)
+    else:
+        yield from _iter_text(fileobj)
+
+
+# -------------------------
+# Import
+# -------------------------
+@dataclass
+class ImportResult:
+    added: dict = field(default_factory=lambda: dict.fromkeys(VALIDATORS, 0))
+    skipped: int = 0
+    duplicates: int = 0
+    errors: list = field(default_factory=list)
+
+    def error(self, collection, index, message):
+        self.skipped += 1
+        if len(self.errors) < MAX_ERRORS:
+            label = KINDS.get(collection, "record")
+            self.errors.append(f"{label} #{index + 1}: {message}")
+
+
+def import_stream(store, fileobj, total_bytes=None, on_progress=None, batch_size=BATCH_SIZE, merge=True):
+    """Validate and merge every record of an export into the store.
+
+    on_progress(fraction) is called after each batch when total_bytes is
+    known. Invalid records are skipped and reported in the result. A file
+    that cannot be read raises ValueError; batches merged before that
+    point stay merged, and the message says how many records they held.
+    merge=False inserts every record as is (see Store.insert_batch).
+    """
+    result = ImportResult()
+    batch = {name: [] for name in VALIDATORS}
+    seen = dict.fromkeys(VALIDATORS, 0)
+    pending = 0
+
+    def flush():
+        added, duplicates = store.insert_batch(**batch, merge=merge)
+        for name, n in added.items():
+            result.added[name] += n
+        result.duplicates += duplicates
+        for rows in batch.values():
+            rows.clear()
+        if on_progress and total_bytes:
+            on_progress(min(fileobj.tell() / total_bytes, 1.0))
+
+    try:
+        for collection, record in iter_records(fileobj):
+            if collection is None:
+                result.error(None, sum(seen.values()), "unknown record kind")
+                continue
+            index = seen[collection]
+            seen[collection] += 1
+            if not isinstance(record, dict):
+                result.error(collection, index, "expected an object")
+                continue
+            try:
+                batch[collection].append(VALIDATORS[collection](record))
+            except ValueError as e:
+                result.error(collection, index, str(e))
+                continue
+            pending += 1
+            if pending >= batch_size:
+                flush()
+                pending = 0
+    except ValueError as e:
+        merged = sum(result.added.values())
+        if not merged:
+            raise
+        raise ValueError(f"{e} ({merged} records before that point were already imported)") from e
+    flush()
+    return result
@@ -0,0 +1,291 @@
+"""Append-only journal of store mutations, with compacted snapshots
+
+SQLite holds the live data; the journal is a logical copy of every
+committed mutation, one JSON Lines record per event, that can rebuild a
+user's data on another machine or after the database file is lost. A
+user's journal is a log file plus snapshots:
+
+- ``<prefix>.log.jsonl``: events numbered by ``seq``, appended after
+  each commit and fsynced every ``SYNC_EVERY`` events or
+  ``SYNC_SECONDS``, whichever comes first;
+- ``<prefix>.snapshot-<seq>.jsonl.gz``: a gzipped JSON Lines export
+  holding the effect of every event up to ``seq``. Once
+  ``SNAPSHOT_EVERY`` events have been logged a new snapshot is written
+  in the background and the log is compacted to the events after it.
+
+``restore`` imports the latest snapshot and replays the log tail. Rows
+are inserted exactly as logged, without the import's duplicate merging,
+so identical tasks or moods logged in the same minute stay distinct and
+later events find the task ids they refer to. That is only correct
+because a snapshot holds exactly the events up to its ``seq``: replaying
+an event twice would insert its rows twice.
+"""
+import hashlib
+import itertools
+import json
+import os
+import re
+import tempfile
+import threading
+
+from focusflow import exporter, importer
+
+JOURNAL_DIR = os.environ.get("FOCUSFLOW_JOURNAL", "")
+SYNC_EVERY = 64
+SYNC_SECONDS = 1.0
+SNAPSHOT_EVERY = 10_000
+REPLAY_BATCH = 1000
+
+SNAPSHOT_FORMAT = "JSON Lines (gzip)"
+
+
+def file_prefix(user=""):
+    """Name the journal files of a user without putting the id in a path"""
+    if not user:
+        return "focusflow"
+    return "user-" + hashlib.sha256(user.encode("utf-8")).hexdigest()[:16]
+
+
+def _fsync_dir(path):
+    if os.name == "nt":
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class Journal:
+    """The log and snapshots of one user, safe to share between threads.
+
+    A read-only journal, for replaying elsewhere, leaves the files as
+    they are: a torn last record is skipped rather than cut off.
+    """
+
+    def __init__(self, directory, user="", readonly=False):
+        if not readonly:
+            os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.readonly = readonly
+        self.prefix = file_prefix(user)
+        self.log_path = os.path.join(directory, f"{self.prefix}.log.jsonl")
+        self._lock = threading.Lock()
+        self._snapshot_lock = threading.Lock()
+        self._file = None
+        self._unsynced = 0
+        self._timer = None
+        if not readonly:
+            self._repair()
+        snapshot_seq = self.latest_snapshot()[0]
+        self.since_snapshot = 0
+        self.seq = snapshot_seq
+        for event in self.events(after=snapshot_seq):
+            self.seq = event["seq"]
+            self.since_snapshot += 1
+
+    def _repair(self):
+        """Cut a record torn by a crash off the end of the log"""
+        if not os.path.exists(self.log_path):
+            return
+        with open(self.log_path, "rb+") as f:
+            data = f.read()
+            if data and not data.endswith(b"\n"):
+                f.truncate(data.rfind(b"\n") + 1)
+
+    # -------------------------
+    # Log
+    # -------------------------
+    def events(self, after=0):
+        """Yield the logged events with a seq greater than after"""
+        if not os.path.exists(self.log_path):
+            return
+        with open(self.log_path, encoding="utf-8") as f:
+            for line in f:
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    return  # torn by a crash while this process was writing
+                if event["seq"] > after:
+                    yield event
+
+    def append(self, events):
+        """Number and write events; they are durable after the next sync"""
+        if self.readonly:
+            raise ValueError("Cannot log to a journal opened read-only")
+        with self._lock:
+            if self._file is None:
+                self._file = open(self.log_path, "a", encoding="utf-8")
+            for event in events:
+                self.seq += 1
+                record = {"seq": self.seq, **event}
+                self._file.write(json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n")
+            self._file.flush()
+            self._unsynced += len(events)
+            self.since_snapshot += len(events)
+            if self._unsynced >= SYNC_EVERY:
+                self._sync()
+            elif self._timer is None:
+                self._timer = threading.Timer(SYNC_SECONDS, self.sync)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def _sync(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._file is not None and self._unsynced:
+            os.fsync(self._file.fileno())
+        self._unsynced = 0
+
+    def sync(self):
+        """Flush logged events to disk now"""
+        with self._lock:
+            self._sync()
+
+    def close(self):
+        with self._lock:
+            self._sync()
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    # -------------------------
+    # Snapshots
+    # -------------------------
+    def snapshots(self):
+        """Return [(seq, path)] of the snapshots on disk, oldest first"""
+        pattern = re.compile(re.escape(self.prefix) + r"\.snapshot-(\d+)\.jsonl\.gz$")
+        found = []
+        for name in os.listdir(self.directory):
+            match = pattern.match(name)
+            if match:
+                found.append((int(match.group(1)), os.path.join(self.directory, name)))
+        return sorted(found)
+
+    def latest_snapshot(self):
+        """Return (seq, path) of the newest snapshot, or (0, None)"""
+        snapshots = self.snapshots()
+        return snapshots[-1] if snapshots else (0, None)
+
+    def snapshot_due(self):
+        return self.since_snapshot >= SNAPSHOT_EVERY and not self._snapshot_lock.locked()
+
+    def snapshot(self, store):
+        """Write a snapshot of the store, then drop the events it covers"""
+        if self.readonly:
+            raise ValueError("Cannot snapshot into a journal opened read-only")
+        if not self._snapshot_lock.acquire(blocking=False):
+            return None
+        try:
+            self.sync()
+            rows = store.iter_export()
+            with store.db.lock:
+                # Under the write lock every commit has been logged and none is in progress;
+                # reading the first row pins the export's read transaction to exactly seq
+                seq = self.seq
+                first = next(rows, None)
+            rows = itertools.chain([first], rows) if first is not None else iter(())
+            fd, tmp = tempfile.mkstemp(dir=self.directory, prefix=f".{self.prefix}.", suffix=".tmp")
+            try:
+                with os.fdopen(fd, "wb") as out:
+                    exporter.write_export(store, SNAPSHOT_FORMAT, out, rows)
+                    out.flush()
+                    os.fsync(out.fileno())
+                path = os.path.join(self.directory, f"{self.prefix}.snapshot-{seq}.jsonl.gz")
+                os.replace(tmp, path)
+            except BaseException:
+                os.unlink(tmp)
+                raise
+            _fsync_dir(self.directory)
+            self._compact(seq)
+            for old_seq, old_path in self.snapshots():
+                if old_seq < seq:
+                    os.unlink(old_path)
+            return path
+        finally:
+            self._snapshot_lock.release()
+
+    def _compact(self, seq):
+        """Rewrite the log keeping only the events after seq"""
+        with self._lock:
+            self._sync()
+            tmp = self.log_path + ".tmp"
+            kept = 0
+            with open(tmp, "w", encoding="utf-8") as out:
+                for event in self.events(after=seq):
+                    out.write(json.dumps(event, ensure_ascii=False, separators=(",", ":")) + "\n")
+                    kept += 1
+                out.flush()
+                os.fsync(out.fileno())
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+            os.replace(tmp, self.log_path)
+            _fsync_dir(self.directory)
+            self.since_snapshot = kept
+
+
+# -------------------------
+# Replay
+# -------------------------
+def apply(store, event):
+    """Apply one logged event to the store"""
+    op = event["op"]
+    if op == "add_task":
+        row = (event["id"], event["name"], event["category"], event["priority"], event["duration"], event["created"])
+        store.insert_batch(tasks=[row], merge=False)
+    elif op == "delete_tasks":
+        store.delete_tasks(event["ids"])
+    elif op == "complete_tasks":
+        store.complete_tasks(event["ids"], event["ts"])
+    elif op == "add_mood":
+        store.insert_batch(moods=[(event["ts"], event["mood"], event["note"])], merge=False)
+    elif op == "insert_batch":
+        store.insert_batch(
+            tasks=[tuple(row) for row in event["tasks"]],
+            moods=[tuple(row) for row in event["moods"]],
+            completed=[tuple(row) for row in event["completed"]],
+            merge=False,
+        )
+    elif op == "clear":
+        store.clear()
+    else:
+        raise ValueError(f"Unknown journal event {op!r}")
+
+
+def replay(store, events, batch_size=REPLAY_BATCH):
+    """Apply events in order, committing every batch_size; return how many"""
+    count = 0
+    events = iter(events)
+    while True:
+        with store.batch():
+            n = 0
+            for event in events:
+                apply(store, event)
+                n += 1
+                if n == batch_size:
+                    break
+        count += n
+        if n < batch_size:
+            return count
+
+
+def restore(store, journal):
+    """Rebuild a user's data from the latest snapshot and the log tail.
+
+    Meant for an empty store: task ids are kept as logged, so later
+    events can refer to them. The store's own journal, if any, is not
+    written to while restoring.
+    """
+    own, store.journal = store.journal, None
+    try:
+        seq, path = journal.latest_snapshot()
+        if path is not None:
+            with open(path, "rb") as f:
+                result = importer.import_stream(store, f, merge=False)
+            if result.skipped:
+                raise ValueError(f"Snapshot {path} has invalid records: {'; '.join(result.errors)}")
+        return replay(store, journal.events(after=seq))
+    finally:
+        store.journal = own
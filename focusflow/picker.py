@@ -0,0 +1,202 @@
+"""Weighted task sampling for the Smart Task Picker
+
+Tasks are bucketed by energy category. Inside a bucket a Fenwick tree
+indexed by duration holds the summed priority weights, so drawing a task
+that fits a time budget is a prefix-sum lookup plus a tree descent
+(O(log D) for D distinct minute values), and adds/removes are O(log D).
+"""
+import heapq
+import random
+import threading
+
+PRIORITY_WEIGHTS = {"Low": 1, "Medium": 3, "High": 5}
+
+
+def priority_weight(priority):
+    """Return numerical weight for priority"""
+    return PRIORITY_WEIGHTS[priority]
+
+
+class Fenwick:
+    """Binary indexed tree over positions 1..size"""
+
+    def __init__(self, size):
+        self.size = size
+        self.tree = [0] * (size + 1)
+
+    def add(self, i, delta):
+        while i <= self.size:
+            self.tree[i] += delta
+            i += i & -i
+
+    def prefix(self, i):
+        """Return the sum of positions 1..i"""
+        i = min(i, self.size)
+        total = 0
+        while i > 0:
+            total += self.tree[i]
+            i -= i & -i
+        return total
+
+    def search(self, target):
+        """Return the smallest position whose prefix sum exceeds target"""
+        pos = 0
+        step = 1 << self.size.bit_length()
+        while step:
+            nxt = pos + step
+            if nxt <= self.size and self.tree[nxt] <= target:
+                pos = nxt
+                target -= self.tree[nxt]
+            step >>= 1
+        return pos + 1
+
+
+class _Bucket:
+    """Tasks of one energy category, slotted by duration then priority"""
+
+    def __init__(self, size):
+        self.weights = Fenwick(size)
+        self.slots = {}  # duration -> {priority: [task ids]}
+
+    def _grow(self, duration):
+        size = self.weights.size
+        while size < duration:
+            size *= 2
+        self.weights = Fenwick(size)
+        for d, slot in self.slots.items():
+            self.weights.add(d, sum(PRIORITY_WEIGHTS[p] * len(ids) for p, ids in slot.items()))
+
+    def add(self, task_id, duration, priority):
+        """Add a task and return its position within its slot"""
+        if duration > self.weights.size:
+            self._grow(duration)
+        ids = self.slots.setdefault(duration, {}).setdefault(priority, [])
+        ids.append(task_id)
+        self.weights.add(duration, PRIORITY_WEIGHTS[priority])
+        return len(ids) - 1
+
+    def remove(self, duration, priority, pos):
+        """Swap-remove the task at pos; return the id moved into its place"""
+        ids = self.slots[duration][priority]
+        last = ids.pop()
+        self.weights.add(duration, -PRIORITY_WEIGHTS[priority])
+        if pos < len(ids):
+            ids[pos] = last
+            return last
+        return None
+
+    def total(self, max_duration):
+        return self.weights.prefix(max_duration)
+
+    def draw(self, r):
+        """Return the task id at integer cumulative weight r (0 <= r < total)"""
+        duration = self.weights.search(r)
+        r -= self.weights.prefix(duration - 1)
+        for priority, ids in self.slots[duration].items():
+            span = PRIORITY_WEIGHTS[priority] * len(ids)
+            if r < span:
+                return ids[r // PRIORITY_WEIGHTS[priority]]
+            r -= span
+        raise AssertionError("picker weights out of sync")
+
+
+class PickerIndex:
+    """Incrementally maintained index for priority-weighted task picks.
+
+    Draws take ``lock``, the store's write lock, so a draw never walks a
+    tree another thread is updating.
+    """
+
+    def __init__(self, max_duration=300, lock=None):
+        self.lock = threading.RLock() if lock is None else lock
+        self.max_duration = max_duration
+        self._buckets = {}
+        self._tasks = {}  # task id -> (category, duration, priority, slot position)
+
+    def __len__(self):
+        return len(self._tasks)
+
+    def __contains__(self, task_id):
+        return task_id in self._tasks
+
+    def add(self, task_id, category, priority, duration):
+        if task_id in self._tasks:
+            self.remove(task_id)
+        bucket = self._buckets.get(category)
+        if bucket is None:
+            bucket = self._buckets[category] = _Bucket(self.max_duration)
+        duration = max(int(duration), 1)
+        pos = bucket.add(task_id, duration, priority)
+        self._tasks[task_id] = (category, duration, priority, pos)
+
+    def remove(self, task_id):
+        entry = self._tasks.pop(task_id, None)
+        if entry is None:
+            return
+        category, duration, priority, pos = entry
+        moved = self._buckets[category].remove(duration, priority, pos)
+        if moved is not None:
+            c, d, p, _ = self._tasks[moved]
+            self._tasks[moved] = (c, d, p, pos)
+
+    def clear(self):
+        self._buckets.clear()
+        self._tasks.clear()
+
+    def groups(self, category=None, max_duration=None):
+        """Return [(duration, priority, task ids)] for every non-empty slot"""
+        with self.lock:
+            buckets = self._buckets.values() if category is None else [self._buckets.get(category)]
+            return [
+                (duration, priority, list(ids))
+                for bucket in buckets if bucket is not None
+                for duration, slot in bucket.slots.items()
+                if max_duration is None or duration <= max_duration
+                for priority, ids in slot.items() if ids
+            ]
+
+    def pick(self, category=None, max_duration=None, rng=random):
+        """Draw a task id weighted by priority, or None if nothing fits.
+
+        category None means any energy level; max_duration None means no
+        time limit.
+        """
+        picks = self.sample(category, max_duration, 1, rng)
+        return picks[0] if picks else None
+
+    def sample(self, category=None, max_duration=None, k=1, rng=random):
+        """Draw k task ids with replacement, like random.choices"""
+        with self.lock:
+            return self._sample(category, max_duration, k, rng)
+
+    def _sample(self, category, max_duration, k, rng):
+        buckets = list(self._buckets.values()) if category is None else [self._buckets.get(category)]
+        buckets = [b for b in buckets if b is not None]
+        limit = max(b.weights.size for b in buckets) if max_duration is None and buckets else max_duration
+        totals = [b.total(limit) for b in buckets]
+        grand_total = sum(totals)
+        if not grand_total:
+            return []
+        picks = []
+        for _ in range(k):
+            r = rng.randrange(grand_total)
+            for bucket, total in zip(buckets, totals):
+                if r < total:
+                    picks.append(bucket.draw(r))
+                    break
+                r -= total
+        return picks
+
+    def sample_distinct(self, k, category=None, max_duration=None, rng=random):
+        """Draw up to k different task ids, weighted by priority.
+
+        Each candidate gets the key u ** (1 / weight) for a uniform u and
+        the k largest keys win (Efraimidis-Spirakis), one pass over the
+        matching slots.
+        """
+        keyed = (
+            (rng.random() ** (1 / PRIORITY_WEIGHTS[priority]), task_id)
+            for _, priority, ids in self.groups(category, max_duration)
+            for task_id in ids
+        )
+        return [task_id for _, task_id in heapq.nlargest(k, keyed)]
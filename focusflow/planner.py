@@ -0,0 +1,141 @@
+"""Time-budget planning: the set of tasks worth the most priority in a budget
+
+Picking tasks to fill a budget is a bounded knapsack. Durations are
+counted in ``UNIT``-minute units (rounded up, so a plan never overruns),
+and tasks with the same units and priority are interchangeable, so the
+backlog collapses into at most 60 x 3 groups whatever its size. Each
+group is split into powers of two (binary splitting) and every piece is
+one vectorized NumPy update of the best-value-per-capacity array. The
+oldest tasks of each chosen group are planned first.
+
+``Planner`` caches plans per task version; a day split into free
+blocks is planned block by block, each from the tasks still left.
+"""
+import heapq
+import threading
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from focusflow.picker import PRIORITY_WEIGHTS, priority_weight
+
+UNIT = 5
+PRIORITY_ORDER = {p: i for i, p in enumerate(sorted(PRIORITY_WEIGHTS, key=PRIORITY_WEIGHTS.get, reverse=True))}
+
+
+@dataclass
+class Plan:
+    task_ids: list = field(default_factory=list)
+    minutes: int = 0
+    weight: int = 0
+
+
+def units(minutes):
+    return -(-int(minutes) // UNIT)
+
+
+def knapsack(groups, capacity):
+    """Return how many items to take from each group.
+
+    groups is a list of (size, value, count) in capacity units; the
+    result maximizes total value with total size <= capacity.
+    """
+    best = np.zeros(capacity + 1, dtype=np.int64)
+    pieces = []  # (group index, size, count) per row of taken
+    taken = []
+    for g, (size, value, count) in enumerate(groups):
+        # More than capacity // size items of a group can never fit
+        count = min(count, capacity // size) if size else 0
+        k = 1
+        while count > 0:
+            n = min(k, count)
+            count -= n
+            k *= 2
+            width = size * n
+            shifted = np.full(capacity + 1, -1, dtype=np.int64)
+            shifted[width:] = best[:capacity + 1 - width] + value * n
+            better = shifted > best
+            best = np.where(better, shifted, best)
+            pieces.append((g, width, n))
+            taken.append(better)
+
+    picked = [0] * len(groups)
+    c = capacity
+    for (g, width, n), better in zip(reversed(pieces), reversed(taken)):
+        if better[c]:
+            picked[g] += n
+            c -= width
+    return picked
+
+
+def plan(store, budget, category=None, exclude=()):
+    """Plan the store's active tasks that fit budget minutes, leaving out exclude"""
+    capacity = int(budget) // UNIT
+    groups = {}
+    for duration, priority, ids in store.picker.groups(category, max_duration=capacity * UNIT):
+        ids = [task_id for task_id in ids if task_id not in exclude] if exclude else ids
+        if ids:
+            groups.setdefault((units(duration), priority), []).extend(ids)
+    keys = list(groups)
+    counts = knapsack(
+        [(size, priority_weight(priority), len(groups[size, priority])) for size, priority in keys], capacity
+    )
+
+    result = Plan()
+    tasks = []
+    for key, n in zip(keys, counts):
+        for task_id in heapq.nsmallest(n, groups[key]):
+            task = store.get_task(task_id)
+            tasks.append(task)
+            result.minutes += task["duration"]
+            result.weight += priority_weight(task["priority"])
+    tasks.sort(key=lambda task: (PRIORITY_ORDER[task["priority"]], task["duration"], task["id"]))
+    result.task_ids = [task["id"] for task in tasks]
+    return result
+
+
+class Planner:
+    """Plans for one store, cached until its tasks change"""
+
+    def __init__(self, store):
+        self.store = store
+        self._lock = threading.Lock()
+        self._version = None
+        self._cache = {}
+
+    def _cached(self, key, build):
+        with self._lock:
+            version = self.store.versions["tasks"]
+            if version != self._version:
+                self._cache.clear()
+                self._version = version
+            if key not in self._cache:
+                self._cache[key] = build()
+            return self._cache[key]
+
+    def plan(self, budget, category=None):
+        """Return the Plan filling budget minutes"""
+        return self._plan((budget,), category)
+
+    def _plan(self, lengths, category, planned=frozenset()):
+        # A block's plan depends only on its length and those of the blocks before it
+        return self._cached((lengths, category), lambda: plan(self.store, lengths[-1], category, exclude=planned))
+
+    def schedule(self, blocks, category=None):
+        """Plan free blocks [(start, end)] in epoch minutes, in order.
+
+        Returns [(start, end, task)] with each block's tasks back to
+        back, highest priority first.
+        """
+        planned = set()
+        lengths = ()
+        entries = []
+        for start, end in blocks:
+            lengths += (end - start,)
+            block = self._plan(lengths, category, frozenset(planned))
+            for task_id in block.task_ids:
+                task = self.store.get_task(task_id)
+                entries.append((start, start + task["duration"], task))
+                start += task["duration"]
+            planned.update(block.task_ids)
+        return entries
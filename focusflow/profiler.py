@@ -0,0 +1,149 @@
+"""Opt-in timing and allocation profile of a rerun
+
+``section(name)`` is a no-op unless a ``Profiler`` is active in the
+current thread, so it can stay in hot paths. When one is, each section
+records wall time and the memory traced by ``tracemalloc``; the whole
+rerun also records the allocation sites that grew the most. Finished
+profiles are appended to a JSONL log for offline analysis.
+
+tracemalloc is process-wide: with several sessions rerunning at once,
+the memory figures include their allocations too. Tracing is started by
+the first memory profiler and stopped when the last one stops, unless it
+was already on.
+"""
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+ENV_FLAG = "FOCUSFLOW_PROFILE"
+LOG_PATH = os.environ.get("FOCUSFLOW_PROFILE_LOG", "focusflow_profile.jsonl")
+TOP_SITES = 10
+
+# Leave the profiler's own bookkeeping out of the allocation report
+SNAPSHOT_FILTERS = (tracemalloc.Filter(False, tracemalloc.__file__), tracemalloc.Filter(False, __file__))
+
+_local = threading.local()
+_log_lock = threading.Lock()
+_trace_lock = threading.Lock()
+_tracers = 0  # memory profilers running
+_started_tracing = False  # whether they turned tracemalloc on
+
+
+def enabled_by_env():
+    return os.environ.get(ENV_FLAG, "") not in ("", "0")
+
+
+def _begin_tracing():
+    global _tracers, _started_tracing
+    with _trace_lock:
+        if not _tracers and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _started_tracing = True
+        _tracers += 1
+
+
+def _end_tracing():
+    global _tracers, _started_tracing
+    with _trace_lock:
+        _tracers -= 1
+        if not _tracers and _started_tracing:
+            tracemalloc.stop()
+            _started_tracing = False
+
+
+def current():
+    """Return the profiler active in this thread, or None"""
+    return getattr(_local, "profiler", None)
+
+
+@contextmanager
+def section(name):
+    """Time the enclosed block under name when profiling is on"""
+    profiler = current()
+    if profiler is None:
+        yield
+        return
+    with profiler.section(name):
+        yield
+
+
+class Profiler:
+    """Collects named sections of one rerun"""
+
+    def __init__(self, memory=True):
+        self.memory = memory
+        self.sections = []
+        self._stack = []
+        self._snapshot = None
+        self._tracing = False
+        self.record = None
+
+    def start(self):
+        if self.memory:
+            _begin_tracing()
+            self._tracing = True
+            tracemalloc.reset_peak()
+            self._snapshot = tracemalloc.take_snapshot().filter_traces(SNAPSHOT_FILTERS)
+        self._start = time.perf_counter()
+        _local.profiler = self
+        return self
+
+    @contextmanager
+    def section(self, name):
+        self._stack.append(name)
+        entry = {"name": "/".join(self._stack)}
+        self.sections.append(entry)
+        mem_before = tracemalloc.get_traced_memory()[0] if self.memory else 0
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            entry["ms"] = round((time.perf_counter() - start) * 1000, 2)
+            if self.memory:
+                current_mem, peak = tracemalloc.get_traced_memory()
+                entry["mem_kb"] = round((current_mem - mem_before) / 1024, 1)
+                entry["peak_kb"] = round(peak / 1024, 1)
+            self._stack.pop()
+
+    def stop(self):
+        """Stop profiling without a record; safe to call more than once"""
+        if current() is self:
+            _local.profiler = None
+        if self._tracing:
+            self._tracing = False
+            self._snapshot = None
+            _end_tracing()
+
+    def finish(self, **context):
+        """Stop profiling this thread and return the rerun's record"""
+        _local.profiler = None
+        record = {
+            "at": datetime.now().isoformat(timespec="seconds"),
+            **context,
+            "total_ms": round((time.perf_counter() - self._start) * 1000, 2),
+            "sections": self.sections,
+        }
+        if self.memory:
+            snapshot = tracemalloc.take_snapshot().filter_traces(SNAPSHOT_FILTERS)
+            stats = snapshot.compare_to(self._snapshot, "lineno")
+            grown = [s for s in stats if s.size_diff > 0]
+            record["alloc_blocks"] = sum(s.count_diff for s in grown)
+            record["alloc_kb"] = round(sum(s.size_diff for s in grown) / 1024, 1)
+            record["peak_kb"] = round(tracemalloc.get_traced_memory()[1] / 1024, 1)
+            record["top"] = [
+                {"site": str(s.traceback[0]), "kb": round(s.size_diff / 1024, 1), "blocks": s.count_diff}
+                for s in grown[:TOP_SITES]
+            ]
+        self.stop()
+        self.record = record
+        return record
+
+
+def write_log(record, path=LOG_PATH):
+    """Append a profile record to the JSONL log"""
+    with _log_lock, open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record, ensure_ascii=False) + "\n")
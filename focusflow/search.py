@@ -0,0 +1,106 @@
+"""Inverted index for searching task names and mood notes
+
+Each document (a task name or a mood note) is split into lower-cased
+word tokens. The index maps each token to the set of ids containing it
+and keeps the vocabulary sorted, so the tokens starting with a prefix
+are one bisect away. New tokens are collected in a set and merged into
+the vocabulary by one sort at the next query, so loading or importing
+many documents does not pay a list insertion per token. Every query word is matched as a prefix and the
+per-word id sets are intersected, smallest first. Adding or removing a
+document only touches its own tokens.
+"""
+import bisect
+import re
+import threading
+
+TOKEN = re.compile(r"\w+")
+
+
+def tokens(text):
+    """Return the distinct search tokens of text"""
+    return set(TOKEN.findall(text.casefold())) if text else set()
+
+
+class TextIndex:
+    """Token -> ids, maintained one document at a time.
+
+    Lookups take ``lock``, the store's write lock, since they may sort
+    the vocabulary and must not see a document half added.
+    """
+
+    def __init__(self, lock=None):
+        self.lock = threading.RLock() if lock is None else lock
+        self.clear()
+
+    def clear(self):
+        self.postings = {}
+        self._vocabulary = []  # sorted tokens with a non-empty posting set, less _pending
+        self._pending = set()  # tokens added since the last sort
+        self.documents = {}  # id -> tokens, for removal
+
+    def __len__(self):
+        return len(self.documents)
+
+    def add(self, doc_id, text):
+        words = tokens(text)
+        if not words:
+            return
+        self.documents[doc_id] = words
+        for word in words:
+            ids = self.postings.get(word)
+            if ids is None:
+                ids = self.postings[word] = set()
+                self._pending.add(word)
+            ids.add(doc_id)
+
+    def remove(self, doc_id):
+        for word in self.documents.pop(doc_id, ()):
+            ids = self.postings[word]
+            ids.discard(doc_id)
+            if not ids:
+                del self.postings[word]
+                if word in self._pending:
+                    self._pending.discard(word)
+                else:
+                    del self._vocabulary[bisect.bisect_left(self._vocabulary, word)]
+
+    @property
+    def vocabulary(self):
+        """The sorted tokens, merging in those added since the last query"""
+        with self.lock:
+            if self._pending:
+                # Timsort merges the sorted run with the sorted new tokens in linear time
+                self._vocabulary = self._vocabulary + sorted(self._pending)
+                self._vocabulary.sort()
+                self._pending = set()
+            return self._vocabulary
+
+    def prefixed(self, prefix):
+        """Return the ids of documents with a token starting with prefix"""
+        with self.lock:
+            return set(self._prefixed(prefix))
+
+    def _prefixed(self, prefix):
+        vocabulary = self.vocabulary
+        start = bisect.bisect_left(vocabulary, prefix)
+        end = bisect.bisect_left(vocabulary, prefix + "\U0010ffff", start)
+        if end - start == 1:
+            return self.postings[vocabulary[start]]
+        ids = set()
+        for word in vocabulary[start:end]:
+            ids |= self.postings[word]
+        return ids
+
+    def search(self, query):
+        """Return the set of ids matching every word of query as a prefix"""
+        words = tokens(query)
+        if not words:
+            return set()
+        with self.lock:
+            matches = sorted((self._prefixed(word) for word in words), key=len)
+            result = set(matches[0])
+            for ids in matches[1:]:
+                result &= ids
+                if not result:
+                    break
+            return result
@@ -0,0 +1,695 @@
+"""SQLite-backed store for tasks, moods and completed tasks
+
+One ``Database`` per file holds the shared connections; every user's
+rows live in the same tables, partitioned by a ``user_id`` column, and
+``Database.partition(user)`` returns that user's ``Store``. With a
+journal directory, every committed mutation is also logged there (see
+``focusflow.journal``).
+"""
+import os
+import queue
+import sqlite3
+import threading
+import weakref
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from focusflow import background
+from focusflow.counters import Counters
+from focusflow.journal import JOURNAL_DIR, Journal
+from focusflow.picker import PickerIndex
+from focusflow.search import TextIndex
+from focusflow.timestamps import TimeColumn, now_minutes, parse
+
+DEFAULT_DB_PATH = os.environ.get("FOCUSFLOW_DB", "focusflow.db")
+MAX_PARTITIONS = int(os.environ.get("FOCUSFLOW_MAX_USERS", "500"))
+READERS = 4
+
+# Dates are stored as epoch minutes (see focusflow.timestamps)
+SCHEMA_VERSION = 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    category TEXT NOT NULL,
+    priority TEXT NOT NULL,
+    duration INTEGER NOT NULL,
+    created INTEGER NOT NULL,
+    user_id TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS idx_tasks_priority ON tasks (user_id, priority);
+CREATE INDEX IF NOT EXISTS idx_tasks_category ON tasks (user_id, category, priority);
+CREATE INDEX IF NOT EXISTS idx_tasks_duration ON tasks (user_id, category, duration);
+CREATE INDEX IF NOT EXISTS idx_tasks_created ON tasks (user_id, created);
+
+CREATE TABLE IF NOT EXISTS moods (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ts INTEGER NOT NULL,
+    mood INTEGER NOT NULL,
+    note TEXT NOT NULL DEFAULT '',
+    user_id TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS idx_moods_ts ON moods (user_id, ts);
+
+CREATE TABLE IF NOT EXISTS completed (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    ts INTEGER NOT NULL,
+    user_id TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS idx_completed_ts ON completed (user_id, ts);
+"""
+
+# Version 0 kept "%Y-%m-%d %H:%M" strings; copy rows across converting dates
+MIGRATE_V0 = [
+    ("tasks", "id, name, category, priority, duration, created",
+     "id, name, category, priority, duration, to_minutes(created)"),
+    ("moods", "id, ts, mood, note", "id, to_minutes(date), mood, note"),
+    ("completed", "id, name, ts", "id, name, to_minutes(date)"),
+]
+
+TASK_COLUMNS = "id, name, category, priority, duration, created"
+COLLECTIONS = ("tasks", "moods", "completed")
+
+
+def _drop_indexes(conn, table):
+    for (index,) in conn.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL",
+        (table,),
+    ).fetchall():
+        conn.execute(f"DROP INDEX {index}")
+
+
+def migrate(conn):
+    """Bring the schema of an open database up to SCHEMA_VERSION"""
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    with conn:
+        if version == 0 and conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'tasks'"
+        ).fetchone():
+            conn.create_function("to_minutes", 1, parse, deterministic=True)
+            for table, _, _ in MIGRATE_V0:
+                _drop_indexes(conn, table)
+                conn.execute(f"ALTER TABLE {table} RENAME TO {table}_v0")
+            conn.executescript(SCHEMA)
+            for table, columns, select in MIGRATE_V0:
+                conn.execute(f"INSERT INTO {table} ({columns}) SELECT {select} FROM {table}_v0")
+                conn.execute(f"DROP TABLE {table}_v0")
+        elif version == 1:
+            # Version 1 had no users; existing rows belong to the default user ""
+            for table in COLLECTIONS:
+                _drop_indexes(conn, table)
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN user_id TEXT NOT NULL DEFAULT ''")
+        conn.executescript(SCHEMA)
+        conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+
+class Database:
+    """Connections to one SQLite file shared by every user and session.
+
+    Writes go through a single connection under a lock; ``transaction``
+    nests, so several mutations can be batched into one commit. Reads
+    borrow a connection from a small pool and, thanks to WAL, never wait
+    for a writer. ``partition(user)`` loads a user's ``Store`` on first
+    use and keeps the most recently used ones in memory. An evicted store
+    that something still holds is handed out again rather than loaded a
+    second time, so a user never has two diverging stores.
+    """
+
+    def __init__(self, path=DEFAULT_DB_PATH, readers=READERS, max_partitions=MAX_PARTITIONS,
+                 journal_dir=JOURNAL_DIR):
+        self.path = path
+        self.lock = threading.RLock()
+        self.conn = self._connect()
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        migrate(self.conn)
+        self._depth = 0
+        self._writer = None  # thread holding an open transaction
+        self._readers = queue.LifoQueue()
+        self._reader_slots = threading.BoundedSemaphore(readers)
+        self._partitions = OrderedDict()
+        self._evicted = weakref.WeakValueDictionary()  # dropped from the LRU, maybe still in use
+        self._loading = {}  # user -> Event set when their store has loaded or failed to
+        self.max_partitions = max_partitions
+        self.journal_dir = journal_dir
+        self._journals = {}
+        self._events = []  # (store, event) logged by the open transaction
+        self._touched = set()  # stores whose memory the open transaction changed
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    @contextmanager
+    def transaction(self):
+        """Hold the write lock; commit when the outermost block exits.
+
+        If the block raises or the commit fails, everything is rolled
+        back and the stores written through ``Store._write`` reload.
+        """
+        with self.lock:
+            self._depth += 1
+            self._writer = threading.get_ident()
+            try:
+                yield self.conn
+                if self._depth == 1:
+                    self.conn.commit()
+            except BaseException:
+                self._depth -= 1
+                if not self._depth:
+                    self._rollback()
+                raise
+            self._depth -= 1
+            if not self._depth:
+                self._writer = None
+                self._touched.clear()
+                if self._events:
+                    self._publish()
+
+    def _rollback(self):
+        """Undo the open transaction, and the memory of the stores it changed"""
+        self._writer = None
+        self._events.clear()
+        touched, self._touched = self._touched, set()
+        self.conn.rollback()
+        for store in touched:
+            store._load()
+            store._bump()
+
+    def _publish(self):
+        """Append the committed transaction's events to their journals"""
+        events, self._events = self._events, []
+        by_store = {}
+        for store, event in events:
+            by_store.setdefault(store, []).append(event)
+        for store, logged in by_store.items():
+            journal = store.journal
+            journal.append(logged)
+            if journal.snapshot_due():
+                background.submit(journal.snapshot, store)
+
+    @contextmanager
+    def reader(self):
+        """Borrow a pooled read connection"""
+        if self._writer == threading.get_ident():
+            # Inside a transaction, read through it to see its own writes
+            yield self.conn
+            return
+        with self._reader_slots:
+            try:
+                conn = self._readers.get_nowait()
+            except queue.Empty:
+                conn = self._connect()
+            try:
+                yield conn
+            finally:
+                if conn.in_transaction:
+                    conn.rollback()
+                self._readers.put(conn)
+
+    def journal(self, user=""):
+        """Return the user's journal, or None when journaling is off"""
+        if not self.journal_dir:
+            return None
+        with self.lock:
+            if user not in self._journals:
+                self._journals[user] = Journal(self.journal_dir, user)
+            return self._journals[user]
+
+    def partition(self, user=""):
+        """Return the Store for this user, loading it on first use.
+
+        Loading runs outside the write lock, so a cold load of a large
+        user does not hold up other users; callers asking for the same
+        user meanwhile wait for that one load.
+        """
+        while True:
+            with self.lock:
+                store = self._partitions.get(user)
+                if store is not None:
+                    self._partitions.move_to_end(user)
+                    return store
+                store = self._evicted.pop(user, None)
+                if store is not None:
+                    self._keep(user, store)
+                    return store
+                loading = self._loading.get(user)
+                if loading is None:
+                    loading = self._loading[user] = threading.Event()
+                    journal = self.journal(user)
+                    break
+            # Another thread is loading this user; take its store, or retry if it failed
+            loading.wait()
+        try:
+            store = Store(self.path, user, database=self, journal=journal)
+            with self.lock:
+                self._keep(user, store)
+            return store
+        finally:
+            with self.lock:
+                del self._loading[user]
+            loading.set()
+
+    def _keep(self, user, store):
+        """Put a store in the LRU, evicting the least recently used; hold the lock"""
+        self._partitions[user] = store
+        while len(self._partitions) > self.max_partitions:
+            evicted_user, evicted = self._partitions.popitem(last=False)
+            self._evicted[evicted_user] = evicted
+
+    def users(self):
+        """Return the ids of every user with stored rows"""
+        with self.reader() as conn:
+            return sorted(row[0] for row in conn.execute(
+                " UNION ".join(f"SELECT DISTINCT user_id FROM {table}" for table in COLLECTIONS)
+            ))
+
+    def close(self):
+        with self.lock:
+            self._partitions.clear()
+            self._evicted.clear()
+            for journal in self._journals.values():
+                journal.close()
+            self.conn.close()
+            while not self._readers.empty():
+                self._readers.get_nowait().close()
+
+
+class Store:
+    """Persistent storage for one user's three FocusFlow collections.
+
+    The store is shared by all of that user's sessions. Completion and
+    mood timestamps are also kept in memory as array-backed columns
+    (``completed`` and ``moods``) for the charts. Active tasks are held
+    in a dict keyed by their stable id and in a ``picker`` index, so
+    lookup, completion and deletion never scan. Task names and mood
+    notes are indexed for search (``search_tasks``, ``search_moods``),
+    and task ids are grouped by priority and category so searches can
+    be filtered by set intersection. ``versions`` counts
+    mutations per collection so derived views know when to rebuild.
+    With a ``journal``, each mutation is logged as an event on commit.
+    """
+
+    def __init__(self, path=DEFAULT_DB_PATH, user="", database=None, journal=None):
+        self.path = path
+        self.user = user
+        self._owns_db = database is None
+        self.db = Database(path) if database is None else database
+        self._conn = self.db.conn
+        self.journal = journal
+        self._attach_lock = threading.RLock()
+        self._attached = {}
+        # Shared by every tab of the user: reads take the write lock too
+        self.counters = Counters(lock=self.db.lock)
+        self._tasks = {}
+        self.picker = PickerIndex(lock=self.db.lock)
+        self.task_text = TextIndex(lock=self.db.lock)
+        self.mood_text = TextIndex(lock=self.db.lock)
+        self._facets = {}  # ("priority" | "category", value) -> active task ids
+        self.completed = TimeColumn()
+        self.moods = TimeColumn("b")
+        self.versions = dict.fromkeys(COLLECTIONS, 0)
+        self._load()
+
+    def _load(self):
+        """Seed the task index, counters and time columns from the tables"""
+        counters = self.counters
+        counters.reset()
+        self._tasks.clear()
+        self.picker.clear()
+        self.task_text.clear()
+        self.mood_text.clear()
+        self._facets.clear()
+        self.completed.clear()
+        self.moods.clear()
+        with self.db.reader() as conn:
+            for row in conn.execute(f"SELECT {TASK_COLUMNS} FROM tasks WHERE user_id = ?", (self.user,)):
+                self._index_task(dict(row))
+            for (ts,) in conn.execute("SELECT ts FROM completed WHERE user_id = ? ORDER BY id", (self.user,)):
+                self.completed.append(ts)
+                counters.task_completed(ts)
+            self.moods.extend(conn.execute("SELECT ts, mood FROM moods WHERE user_id = ? ORDER BY id", (self.user,)))
+            counters.mood_logged(None, len(self.moods), sum(self.moods.values))
+            for mood_id, note in conn.execute("SELECT id, note FROM moods WHERE user_id = ? AND note != ''", (self.user,)):
+                self.mood_text.add(mood_id, note)
+
+    def _index_task(self, task):
+        self._tasks[task["id"]] = task
+        self.counters.task_added(task["priority"], task["category"])
+        self.picker.add(task["id"], task["category"], task["priority"], task["duration"])
+        self.task_text.add(task["id"], task["name"])
+        for facet in ("priority", "category"):
+            self._facets.setdefault((facet, task[facet]), set()).add(task["id"])
+
+    def _unindex_task(self, task_id):
+        task = self._tasks.pop(task_id)
+        self.counters.task_removed(task["priority"], task["category"])
+        self.picker.remove(task_id)
+        self.task_text.remove(task_id)
+        for facet in ("priority", "category"):
+            self._facets[(facet, task[facet])].discard(task_id)
+        return task
+
+    def _log(self, op, **fields):
+        """Queue an event for the journal; call inside a transaction"""
+        if self.journal is not None:
+            self.db._events.append((self, {"op": op, **fields}))
+
+    def _bump(self, *collections):
+        for name in collections or COLLECTIONS:
+            self.versions[name] += 1
+
+    def attach(self, name, factory):
+        """Return the helper registered under name, creating factory(self) once"""
+        with self._attach_lock:
+            if name not in self._attached:
+                self._attached[name] = factory(self)
+            return self._attached[name]
+
+    @contextmanager
+    def _write(self):
+        """A transaction that changes this store's memory before it commits"""
+        with self.db.transaction() as conn:
+            self.db._touched.add(self)
+            yield conn
+
+    @contextmanager
+    def batch(self):
+        """Group several mutations into a single transaction and commit"""
+        with self._write():
+            yield self
+
+    def close(self):
+        if self._owns_db:
+            self.db.close()
+
+    def _query(self, sql, params=()):
+        with self.db.reader() as conn:
+            return [dict(row) for row in conn.execute(sql, params)]
+
+    # -------------------------
+    # Tasks
+    # -------------------------
+    def add_task(self, name, category, priority, duration, created=None):
+        """Insert a task and return its id"""
+        task = {
+            "name": name,
+            "category": category,
+            "priority": priority,
+            "duration": int(duration),
+            "created": now_minutes() if created is None else created,
+        }
+        with self._write() as conn:
+            cur = conn.execute(
+                "INSERT INTO tasks (name, category, priority, duration, created, user_id) VALUES (?, ?, ?, ?, ?, ?)",
+                (name, category, priority, task["duration"], task["created"], self.user),
+            )
+            task["id"] = cur.lastrowid
+            self._index_task(task)
+            self._log("add_task", **task)
+            self._bump("tasks")
+        return task["id"]
+
+    def get_task(self, task_id):
+        """Return the active task with this id, or None"""
+        return self._tasks.get(task_id)
+
+    def active_tasks(self):
+        """Return the active tasks, in no particular order"""
+        with self.db.lock:
+            return list(self._tasks.values())
+
+    def delete_task(self, task_id):
+        return self.delete_tasks([task_id]) > 0
+
+    def delete_tasks(self, task_ids):
+        """Delete several tasks in one transaction; return how many existed"""
+        with self._write() as conn:
+            ids = [task_id for task_id in dict.fromkeys(task_ids) if task_id in self._tasks]
+            if not ids:
+                return 0
+            conn.executemany("DELETE FROM tasks WHERE id = ?", [(task_id,) for task_id in ids])
+            for task_id in ids:
+                self._unindex_task(task_id)
+            self._log("delete_tasks", ids=ids)
+            self._bump("tasks")
+        return len(ids)
+
+    def _task_filter(self, priorities=None, category=None, max_duration=None):
+        clauses, params = ["user_id = ?"], [self.user]
+        if priorities is not None:
+            clauses.append(f"priority IN ({', '.join('?' * len(priorities))})")
+            params.extend(priorities)
+        if category is not None:
+            clauses.append("category = ?")
+            params.append(category)
+        if max_duration is not None:
+            clauses.append("duration <= ?")
+            params.append(max_duration)
+        return f" WHERE {' AND '.join(clauses)}", params
+
+    def list_tasks(self, priorities=None, category=None, max_duration=None, limit=None, offset=0):
+        """Return tasks matching the filters, oldest first"""
+        where, params = self._task_filter(priorities, category, max_duration)
+        sql = f"SELECT {TASK_COLUMNS} FROM tasks{where} ORDER BY id"
+        if limit is not None:
+            sql += " LIMIT ? OFFSET ?"
+            params.extend((limit, offset))
+        return self._query(sql, params)
+
+    def count_tasks(self, priorities=None, category=None):
+        return self.counters.count_tasks(priorities, category)
+
+    def search_tasks(self, query, priorities=None, category=None):
+        """Return the ids of active tasks matching query and the filters, oldest first"""
+        with self.db.lock:
+            ids = self.task_text.search(query)
+            if category is not None:
+                ids &= self._facets.get(("category", category), set())
+            if priorities is not None:
+                ids = set().union(*(ids & self._facets.get(("priority", p), set()) for p in priorities))
+        return sorted(ids)
+
+    # -------------------------
+    # Completed tasks
+    # -------------------------
+    def complete_task(self, task_id, ts=None):
+        """Log a completion for the task and remove it from the task list"""
+        return self.complete_tasks([task_id], ts) > 0
+
+    def complete_tasks(self, task_ids, ts=None):
+        """Complete several tasks in one transaction; return how many were active"""
+        ts = now_minutes() if ts is None else ts
+        with self._write() as conn:
+            ids = [task_id for task_id in dict.fromkeys(task_ids) if task_id in self._tasks]
+            if not ids:
+                return 0
+            conn.executemany(
+                "INSERT INTO completed (name, ts, user_id) VALUES (?, ?, ?)",
+                [(self._tasks[task_id]["name"], ts, self.user) for task_id in ids],
+            )
+            conn.executemany("DELETE FROM tasks WHERE id = ?", [(task_id,) for task_id in ids])
+            for task_id in ids:
+                self._unindex_task(task_id)
+                self.completed.append(ts)
+            self.counters.task_completed(ts, len(ids))
+            self._log("complete_tasks", ids=ids, ts=ts)
+            self._bump("tasks", "completed")
+        return len(ids)
+
+    def list_completed(self):
+        return self._query("SELECT name, ts FROM completed WHERE user_id = ? ORDER BY id", (self.user,))
+
+    # -------------------------
+    # Moods
+    # -------------------------
+    def add_mood(self, mood, note="", ts=None):
+        ts = now_minutes() if ts is None else ts
+        with self._write() as conn:
+            cur = conn.execute(
+                "INSERT INTO moods (ts, mood, note, user_id) VALUES (?, ?, ?, ?)",
+                (ts, int(mood), note or "", self.user),
+            )
+            self.moods.append(ts, int(mood))
+            self.counters.mood_logged(int(mood))
+            self.mood_text.add(cur.lastrowid, note)
+            self._log("add_mood", ts=ts, mood=int(mood), note=note or "")
+            self._bump("moods")
+        return cur.lastrowid
+
+    def recent_moods(self, n):
+        """Return the last n mood entries, oldest first"""
+        rows = self._query(
+            "SELECT id, ts, mood, note FROM moods WHERE user_id = ? ORDER BY id DESC LIMIT ?", (self.user, n)
+        )
+        rows.reverse()
+        return rows
+
+    def list_moods(self):
+        return self._query("SELECT id, ts, mood, note FROM moods WHERE user_id = ? ORDER BY id", (self.user,))
+
+    def search_moods(self, query, limit=None):
+        """Return the mood entries whose note matches query, newest first"""
+        ids = sorted(self.mood_text.search(query), reverse=True)[:limit]
+        if not ids:
+            return []
+        return self._query(
+            f"SELECT id, ts, mood, note FROM moods WHERE id IN ({', '.join('?' * len(ids))}) ORDER BY id DESC", ids
+        )
+
+    # -------------------------
+    # Import / export
+    # -------------------------
+    def iter_export(self, batch_size=1000):
+        """Yield (collection, row) for every stored row, dates as epoch minutes.
+
+        Rows are read in batches on a pooled read connection inside one
+        read transaction, so an export is a consistent snapshot and does
+        not hold the write lock while it is written out.
+        """
+        with self.db.reader() as conn:
+            conn.execute("BEGIN")
+            for collection, sql in (
+                ("tasks", f"SELECT {TASK_COLUMNS} FROM tasks WHERE user_id = ? ORDER BY id"),
+                ("moods", "SELECT ts, mood, note FROM moods WHERE user_id = ? ORDER BY id"),
+                ("completed", "SELECT name, ts FROM completed WHERE user_id = ? ORDER BY id"),
+            ):
+                cur = conn.execute(sql, (self.user,))
+                while rows := cur.fetchmany(batch_size):
+                    for row in rows:
+                        yield collection, dict(row)
+
+    def insert_batch(self, tasks=(), moods=(), completed=(), merge=True):
+        """Merge validated rows (see focusflow.importer) in one transaction.
+
+        Task rows are (id, name, category, priority, duration, created); an
+        exported id is kept when it is free, otherwise a new one is
+        assigned. Moods and completions already present are skipped.
+        With merge=False every row is inserted as given and a task id
+        that is already taken raises ValueError, for replaying a journal.
+        Returns ({collection: rows added}, duplicates skipped).
+        """
+        added = dict.fromkeys(COLLECTIONS, 0)
+        duplicates = 0
+        with self._write() as conn:
+            if tasks:
+                existing = {
+                    (t["name"], t["category"], t["priority"], t["duration"], t["created"])
+                    for t in self._tasks.values()
+                } if merge else set()
+                new_tasks = []
+                for task_id, *fields in tasks:
+                    if fields[4] is None:
+                        fields[4] = now_minutes()
+                    if merge and tuple(fields) in existing:
+                        duplicates += 1
+                        continue
+                    new_tasks.append([task_id, *fields])
+                for row, task_id in zip(new_tasks, self._new_task_ids([row[0] for row in new_tasks])):
+                    if not merge and row[0] is not None and row[0] != task_id:
+                        raise ValueError(f"Task id {row[0]} is already taken")
+                    row[0] = task_id
+                conn.executemany(
+                    "INSERT INTO tasks (id, name, category, priority, duration, created, user_id) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    [(*row, self.user) for row in new_tasks],
+                )
+                for row in new_tasks:
+                    self._index_task(dict(zip(("id", "name", "category", "priority", "duration", "created"), row)))
+                added["tasks"] = len(new_tasks)
+            if moods:
+                existing = self._existing("SELECT ts, mood, note FROM moods", moods) if merge else ()
+                new_moods = [row for row in moods if tuple(row) not in existing]
+                last_id = self._last_id(conn, "moods")
+                conn.executemany(
+                    "INSERT INTO moods (ts, mood, note, user_id) VALUES (?, ?, ?, ?)",
+                    [(*row, self.user) for row in new_moods],
+                )
+                for ts, mood, _ in new_moods:
+                    self.moods.append(ts, mood)
+                    self.counters.mood_logged(mood)
+                if any(note for _, _, note in new_moods):
+                    # Writes are serialized, so the new rows are the ones numbered after last_id
+                    for mood_id, note in conn.execute(
+                        "SELECT id, note FROM moods WHERE id > ? AND user_id = ? AND note != ''", (last_id, self.user)
+                    ):
+                        self.mood_text.add(mood_id, note)
+                added["moods"] = len(new_moods)
+                duplicates += len(moods) - len(new_moods)
+            if completed:
+                existing = self._existing("SELECT name, ts FROM completed", completed, ts_col=1) if merge else ()
+                new_completed = [row for row in completed if tuple(row) not in existing]
+                conn.executemany(
+                    "INSERT INTO completed (name, ts, user_id) VALUES (?, ?, ?)",
+                    [(*row, self.user) for row in new_completed],
+                )
+                for _, ts in new_completed:
+                    self.completed.append(ts)
+                    self.counters.task_completed(ts)
+                added["completed"] = len(new_completed)
+                duplicates += len(completed) - len(new_completed)
+            if any(added.values()):
+                self._log(
+                    "insert_batch",
+                    tasks=new_tasks if added["tasks"] else [],
+                    moods=new_moods if added["moods"] else [],
+                    completed=new_completed if added["completed"] else [],
+                )
+            self._bump(*(name for name, n in added.items() if n))
+        return added, duplicates
+
+    def _last_id(self, conn, table):
+        seq = conn.execute("SELECT seq FROM sqlite_sequence WHERE name = ?", (table,)).fetchone()
+        return seq[0] if seq else 0
+
+    def _new_task_ids(self, wanted):
+        """Keep wanted ids that are free and unique, numbering the rest after the highest id"""
+        # Ids are unique across users, so check the table rather than this partition
+        numbered = [task_id for task_id in wanted if isinstance(task_id, int) and task_id > 0]
+        taken = set(self._tasks)
+        if numbered:
+            taken.update(row[0] for row in self._conn.execute(
+                "SELECT id FROM tasks WHERE id BETWEEN ? AND ?", (min(numbered), max(numbered))
+            ))
+        ids = []
+        for task_id in wanted:
+            if isinstance(task_id, int) and task_id > 0 and task_id not in taken:
+                taken.add(task_id)
+                ids.append(task_id)
+            else:
+                ids.append(None)
+        next_id = max(self._last_id(self._conn, "tasks"), max(taken, default=0)) + 1
+        for i, task_id in enumerate(ids):
+            if task_id is None:
+                ids[i] = next_id
+                next_id += 1
+        return ids
+
+    def _existing(self, select, rows, ts_col=0):
+        """Return the stored rows that fall in the time range of a batch"""
+        low = min(row[ts_col] for row in rows)
+        high = max(row[ts_col] for row in rows)
+        return set(map(tuple, self._conn.execute(
+            f"{select} WHERE user_id = ? AND ts BETWEEN ? AND ?", (self.user, low, high)
+        )))
+
+    def _clear(self):
+        self._tasks.clear()
+        for table in COLLECTIONS:
+            self._conn.execute(f"DELETE FROM {table} WHERE user_id = ?", (self.user,))
+
+    def clear(self):
+        with self._write():
+            self._clear()
+            self.counters.reset()
+            self.picker.clear()
+            self.task_text.clear()
+            self.mood_text.clear()
+            self._facets.clear()
+            self.completed.clear()
+            self.moods.clear()
+            self._log("clear")
+            self._bump()
@@ -0,0 +1,81 @@
+"""Epoch-minute timestamps and the array-backed columns that hold them
+
+Records keep local wall-clock time as whole minutes since 1970-01-01, so
+day and hour buckets are plain integer division and strings are only
+produced for display and export.
+"""
+from array import array
+from datetime import date, datetime, timedelta
+
+DATE_FORMAT = "%Y-%m-%d %H:%M"
+EPOCH = datetime(1970, 1, 1)
+MINUTES_PER_DAY = 1440
+
+
+def to_minutes(dt):
+    """Return a datetime as whole minutes since the epoch"""
+    return (dt - EPOCH) // timedelta(minutes=1)
+
+
+def from_minutes(minutes):
+    return EPOCH + timedelta(minutes=minutes)
+
+
+def now_minutes():
+    return to_minutes(datetime.now())
+
+
+def parse(text):
+    """Parse a "%Y-%m-%d %H:%M" string (or a bare date) into minutes"""
+    try:
+        return to_minutes(datetime.strptime(text, DATE_FORMAT))
+    except ValueError:
+        return to_minutes(datetime.strptime(text, "%Y-%m-%d"))
+
+
+def format_minutes(minutes, fmt=DATE_FORMAT):
+    return from_minutes(minutes).strftime(fmt)
+
+
+def day_of(minutes):
+    """Return the epoch day a timestamp falls on"""
+    return minutes // MINUTES_PER_DAY
+
+
+def day_number(d):
+    """Return the epoch day of a date"""
+    return (d - EPOCH.date()).days
+
+
+def day_to_date(day):
+    return EPOCH.date() + timedelta(days=day)
+
+
+def today():
+    return day_number(date.today())
+
+
+class TimeColumn:
+    """Append-only epoch-minute column with an optional parallel value column"""
+
+    def __init__(self, value_typecode=None):
+        self.ts = array("q")
+        self.values = array(value_typecode) if value_typecode else None
+
+    def __len__(self):
+        return len(self.ts)
+
+    def append(self, ts, value=None):
+        self.ts.append(ts)
+        if self.values is not None:
+            self.values.append(value)
+
+    def extend(self, rows):
+        """Append (ts,) or (ts, value) rows"""
+        for row in rows:
+            self.append(*row)
+
+    def clear(self):
+        del self.ts[:]
+        if self.values is not None:
+            del self.values[:]
@@ -0,0 +1,45 @@
+"""Streamlit pages, one module each, imported on first visit
+
+Only the page being shown is imported, and pandas/Plotly are only
+imported once a chart is drawn, so a new worker does not pay for them
+on its first rerun. The cost of each first import is recorded in
+IMPORT_TIMES and logged; set FOCUSFLOW_IMPORT_TIMES=1 to print it.
+"""
+import importlib
+import logging
+import os
+import sys
+import time
+
+# label -> module in this package
+PAGES = {
+    "📊 Dashboard": "dashboard",
+    "➕ Add Tasks": "add_tasks",
+    "🎯 Pick Task": "pick_task",
+    "😊 Mood Tracker": "mood_tracker",
+    "📈 Analytics": "analytics",
+}
+
+IMPORT_TIMES = {}  # module name -> seconds taken by its first import
+
+logger = logging.getLogger(__name__)
+if os.environ.get("FOCUSFLOW_IMPORT_TIMES"):
+    logger.addHandler(logging.StreamHandler())
+    logger.setLevel(logging.INFO)
+
+
+def timed_import(name):
+    """Import a module, recording how long the first import took"""
+    module = sys.modules.get(name)
+    if module is not None:
+        return module
+    start = time.perf_counter()
+    module = importlib.import_module(name)
+    IMPORT_TIMES[name] = elapsed = time.perf_counter() - start
+    logger.info("imported %s in %.1f ms", name, elapsed * 1000)
+    return module
+
+
+def load_page(label):
+    """Return the module rendering the page with this label"""
+    return timed_import(f"{__name__}.{PAGES[label]}")
@@ -0,0 +1,229 @@
+"""Add Tasks page"""
+import streamlit as st
+
+from focusflow.profiler import section
+from focusflow.ui import timed_import
+from focusflow.ui.fragments import changed, region
+
+PAGE_SIZES = [10, 25, 50, 100]
+
+
+@region("bulk add")
+def bulk_add(store):
+    """Paste or upload many tasks; valid rows are added together, bad rows reported"""
+    with st.form("bulk_add_form", clear_on_submit=True):
+        text = st.text_area(
+            "One task per line, or CSV with a header row",
+            placeholder="Write blog post\nReview PR, High energy, High, 45\n\nor: name,energy,priority,duration",
+            height=150,
+        )
+        uploaded = st.file_uploader("...or upload a CSV / text file", type=["csv", "txt"])
+        
+        st.caption("Defaults for missing columns")
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            category = st.selectbox("Energy Level", ["Low energy", "High energy"])
+        with col2:
+            priority = st.selectbox("Priority", ["Low", "Medium", "High"], index=1)
+        with col3:
+            duration = st.number_input("Duration (min)", 5, 300, 30, step=5)
+        
+        if st.form_submit_button("📋 Add Tasks", use_container_width=True):
+            if uploaded is not None:
+                text = uploaded.getvalue().decode("utf-8-sig", errors="replace")
+            if text.strip():
+                bulk = timed_import("focusflow.bulk")
+                with section("bulk add"):
+                    st.session_state.bulk_result = bulk.add_tasks(store, text, category, priority, duration)
+                changed(store)
+            else:
+                st.error("Paste some tasks or choose a file")
+    
+    if "bulk_result" in st.session_state:
+        result = st.session_state.pop("bulk_result")
+        st.success(f"✅ Added {result.added} tasks")
+        if result.duplicates:
+            st.info(f"Skipped {result.duplicates} tasks already in your list")
+        if result.skipped:
+            with st.expander(f"⚠️ {result.skipped} rows skipped", expanded=True):
+                for message in result.errors:
+                    st.write(message)
+
+
+def bulk_actions(store, tasks):
+    """Pick tasks in a table and complete or delete all of them in one rerun"""
+    select_all = st.checkbox("Select all on this page", key="bulk_select_all")
+    rows = [
+        {
+            "Select": select_all,
+            "Task": task["name"],
+            "Energy": task["category"],
+            "Priority": task["priority"],
+            "Minutes": task["duration"],
+            "id": task["id"],
+        }
+        for task in tasks
+    ]
+    # A new key whenever the rows change, so a selection never carries over to other tasks
+    key = f"bulk_{hash((select_all, tuple(row['id'] for row in rows)))}"
+    with section("task table"):
+        edited = st.data_editor(
+            rows,
+            key=key,
+            hide_index=True,
+            use_container_width=True,
+            disabled=["Task", "Energy", "Priority", "Minutes"],
+            column_config={"Select": st.column_config.CheckboxColumn("✓"), "id": None},
+        )
+    selected = [row["id"] for row in edited if row["Select"]]
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button(f"✓ Complete {len(selected)} selected", disabled=not selected, use_container_width=True):
+            count = store.complete_tasks(selected)
+            st.success(f"{count} tasks completed! 🎉")
+            # The page now holds other tasks; do not select them too
+            st.session_state.pop("bulk_select_all", None)
+            changed(store)
+    with col2:
+        if st.button(f"🗑️ Delete {len(selected)} selected", disabled=not selected, use_container_width=True):
+            store.delete_tasks(selected)
+            st.session_state.pop("bulk_select_all", None)
+            changed(store)
+
+
+@region("add form")
+def add_form(store):
+    with st.form("add_task_form", clear_on_submit=True):
+        st.subheader("Create New Task")
+        
+        task_name = st.text_input("Task Name *", placeholder="e.g., Write blog post")
+        
+        col1, col2, col3 = st.columns(3)
+        
+        with col1:
+            category = st.selectbox("Energy Level *", ["Low energy", "High energy"])
+        
+        with col2:
+            priority = st.selectbox("Priority *", ["Low", "Medium", "High"])
+        
+        with col3:
+            duration = st.number_input("Duration (min) *", 5, 300, 30, step=5)
+        
+        submitted = st.form_submit_button("✨ Add Task", use_container_width=True)
+        
+        if submitted:
+            if task_name.strip():
+                store.add_task(task_name.strip(), category, priority, duration)
+                st.success("✅ Task added successfully!")
+                changed(store)
+            else:
+                st.error("Please enter a task name")
+
+
+@region("task list", "tasks")
+def task_list(store):
+    counters = store.counters
+    
+    total_tasks = counters.count_tasks()
+    if total_tasks:
+        query = st.text_input("🔍 Search tasks", placeholder="Words or the start of words, e.g. \"rev blog\"")
+        
+        # Filter options
+        col1, col2 = st.columns([2, 1])
+        with col1:
+            filter_priority = st.multiselect(
+                "Filter by Priority",
+                ["Low", "Medium", "High"],
+                default=["Low", "Medium", "High"]
+            )
+        with col2:
+            filter_energy = st.selectbox(
+                "Filter by Energy",
+                ["All", "Low energy", "High energy"]
+            )
+        filter_category = None if filter_energy == "All" else filter_energy
+        
+        if query.strip():
+            # Match ids from the search index, then read the visible page from memory
+            with section("task search"):
+                matches = store.search_tasks(query, filter_priority, filter_category)
+            match_count = len(matches)
+        else:
+            # Count matches from the counters, then fetch only the visible page
+            matches = None
+            match_count = counters.count_tasks(filter_priority, filter_category)
+        
+        col1, col2 = st.columns([2, 1])
+        with col2:
+            page_size = st.selectbox("Tasks per page", PAGE_SIZES, index=1)
+        page_count = max(1, -(-match_count // page_size))
+        with col1:
+            page_number = st.number_input("Page", 1, page_count, 1, step=1) if page_count > 1 else 1
+        
+        offset = (page_number - 1) * page_size
+        with section("task query"):
+            if matches is not None:
+                filtered_tasks = [store.get_task(task_id) for task_id in matches[offset:offset + page_size]]
+            else:
+                filtered_tasks = store.list_tasks(
+                    priorities=filter_priority,
+                    category=filter_category,
+                    limit=page_size,
+                    offset=offset,
+                )
+        
+        st.markdown(
+            f"Showing {offset + 1 if filtered_tasks else 0}–{offset + len(filtered_tasks)} "
+            f"of {match_count} matching tasks ({total_tasks} total)"
+        )
+        
+        if st.toggle("Select multiple", help="Complete or delete several tasks at once"):
+            bulk_actions(store, filtered_tasks)
+            return
+        
+        with section("task cards"):
+            for task in filtered_tasks:
+                col1, col2, col3 = st.columns([6, 1, 1])
+                
+                priority_class = f"task-card-{task['priority'].lower()}"
+                
+                with col1:
+                    st.markdown(f"""
+                    <div class='task-card {priority_class}'>
+                        <strong style='font-size: 1.1rem;'>{task['name']}</strong><br>
+                        <small>🔋 {task['category']} • ⏱️ {task['duration']} min • 🎯 {task['priority']} Priority</small>
+                    </div>
+                    """, unsafe_allow_html=True)
+                
+                with col2:
+                    if st.button("✓", key=f"complete_{task['id']}", help="Mark as complete"):
+                        store.complete_task(task["id"])
+                        st.success("Task completed! 🎉")
+                        changed(store)
+                
+                with col3:
+                    if st.button("🗑️", key=f"delete_{task['id']}", help="Delete task"):
+                        store.delete_task(task['id'])
+                        changed(store)
+    else:
+        st.info("No tasks yet. Add your first task above!")
+
+
+def render(store):
+    st.markdown("<h1 class='main-header'>Add Tasks</h1>", unsafe_allow_html=True)
+    st.markdown("Create and manage your task list")
+    
+    st.markdown("---")
+    
+    add_form()
+    
+    with st.expander("📋 Add many tasks at once", expanded="bulk_result" in st.session_state):
+        bulk_add()
+    
+    st.markdown("---")
+    
+    # Display Tasks
+    st.subheader("📝 Your Tasks")
+    
+    task_list()
@@ -0,0 +1,105 @@
+"""Analytics page"""
+import streamlit as st
+
+from focusflow.ui.resources import get_figures
+from focusflow.timestamps import day_to_date, today
+
+POLL_SECONDS = 1.0
+
+
+def _chart(name, polling):
+    fig, fresh = get_figures().figure_async(name)
+    if fresh and polling:
+        # The rebuild finished: a full rerun draws it and stops the polling
+        st.rerun()
+    if fig is None:
+        st.info("⏳ Crunching the numbers...")
+    else:
+        if not fresh:
+            st.caption("⏳ Updating with your latest data...")
+        st.plotly_chart(fig, use_container_width=True)
+
+
+def background_chart(name):
+    """Draw a chart built off the script thread, showing the last one until it is ready"""
+    _, fresh = get_figures().figure_async(name)
+    st.fragment(_chart, run_every=None if fresh else POLL_SECONDS)(name, not fresh)
+
+
+def render(store):
+    counters = store.counters
+    
+    st.markdown("<h1 class='main-header'>Analytics</h1>", unsafe_allow_html=True)
+    st.markdown("Deep dive into your productivity patterns")
+    
+    st.markdown("---")
+    
+    has_tasks = counters.count_tasks() > 0
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.subheader("Task Distribution")
+        
+        if has_tasks:
+            # Priority distribution
+            background_chart("priority_pie")
+        else:
+            st.info("No tasks to analyze")
+    
+    with col2:
+        st.subheader("Energy Distribution")
+        
+        if has_tasks:
+            background_chart("energy_bar")
+        else:
+            st.info("No tasks to analyze")
+    
+    st.markdown("---")
+    
+    col1, col2 = st.columns(2)
+    
+    with col1:
+        st.subheader("Completion Stats")
+        completed = counters.completed_total
+        
+        if completed:
+            background_chart("daily_completions")
+        else:
+            st.info("No completed tasks yet")
+    
+    with col2:
+        st.subheader("Productivity Streak")
+        
+        if completed:
+            history = counters.completed_by_day
+            best_day, best_count = history.best_day()
+            best_week, best_week_count = history.best_window(7)
+            
+            col_a, col_b = st.columns(2)
+            with col_a:
+                st.metric("Current Streak", f"{history.streak(today())} days")
+                st.metric("Total Completed", completed)
+                st.metric("Best Day", best_count, help=day_to_date(best_day).strftime("%b %d, %Y"))
+            with col_b:
+                st.metric("Longest Streak", f"{history.longest_streak()[1]} days")
+                st.metric("Best Week", best_week_count,
+                          help=f"7 days from {day_to_date(best_week).strftime('%b %d, %Y')}")
+        else:
+            st.info("Complete tasks to see your streak!")
+    
+    st.markdown("---")
+    st.subheader("Mood & Productivity")
+    
+    if completed and counters.mood_count:
+        col1, col2 = st.columns(2)
+        with col1:
+            background_chart("mood_bands")
+        with col2:
+            background_chart("mood_correlation")
+        background_chart("hour_heatmap")
+    elif completed:
+        background_chart("hour_heatmap")
+        st.info("Log your mood to see how it relates to what you get done")
+    else:
+        st.info("Complete tasks and log your mood to see how they relate")
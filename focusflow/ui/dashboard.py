@@ -0,0 +1,77 @@
+"""Dashboard page"""
+import streamlit as st
+
+from focusflow.ui.resources import get_figures
+
+
+def render(store):
+    counters = store.counters
+    
+    st.markdown("<h1 class='main-header'>Dashboard</h1>", unsafe_allow_html=True)
+    st.markdown("Your productivity at a glance")
+    
+    st.markdown("---")
+    
+    # Metrics Row
+    col1, col2, col3, col4 = st.columns(4)
+    
+    with col1:
+        st.metric(
+            "Total Tasks",
+            counters.count_tasks(),
+            delta=None
+        )
+    
+    with col2:
+        completed_count = counters.completed_total
+        st.metric(
+            "Completed",
+            completed_count,
+            delta=None
+        )
+    
+    with col3:
+        avg_mood = counters.average_mood()
+        st.metric(
+            "Avg Mood",
+            f"{avg_mood}/10",
+            delta=None
+        )
+    
+    with col4:
+        high_priority = counters.count_tasks(priorities=["High"])
+        st.metric(
+            "High Priority",
+            high_priority,
+            delta=None
+        )
+    
+    st.markdown("---")
+    
+    # Main Content
+    col1, col2 = st.columns([2, 1])
+    
+    with col1:
+        st.subheader("📋 Recent Tasks")
+        
+        recent_tasks = store.list_tasks(limit=5)
+        if recent_tasks:
+            for task in recent_tasks:
+                priority_class = f"task-card-{task['priority'].lower()}"
+                
+                st.markdown(f"""
+                <div class='task-card {priority_class}'>
+                    <strong>{task['name']}</strong><br>
+                    <small>🔋 {task['category']} • ⏱️ {task['duration']} min • 🎯 {task['priority']} Priority</small>
+                </div>
+                """, unsafe_allow_html=True)
+        else:
+            st.info("No tasks yet. Add your first task to get started!")
+    
+    with col2:
+        st.subheader("😊 Mood Overview")
+        
+        if counters.mood_count:
+            st.plotly_chart(get_figures().figure("dashboard_moods"), use_container_width=True)
+        else:
+            st.info("No mood data yet. Track your mood to see trends!")
@@ -0,0 +1,38 @@
+"""Rerun profiler panel, enabled with FOCUSFLOW_PROFILE=1 or ?profile=1"""
+import streamlit as st
+
+from focusflow import profiler
+
+
+def start_profiler():
+    """Start profiling this rerun if requested; return the profiler or None"""
+    if not (profiler.enabled_by_env() or st.query_params.get("profile") == "1"):
+        return None
+    return profiler.Profiler().start()
+
+
+def stop_profiler(active):
+    """Stop a profiler whose rerun ended early, e.g. by st.rerun()"""
+    if active is not None:
+        active.stop()
+
+
+def finish_profiler(active, store, page):
+    """Log the rerun's profile and show it in a collapsible panel"""
+    if active is None:
+        return
+    record = active.finish(
+        page=page,
+        user=store.user,
+        tasks=store.count_tasks(),
+        moods=len(store.moods),
+        completed=len(store.completed),
+    )
+    profiler.write_log(record)
+    with st.expander(f"🔧 Rerun profile: {record['total_ms']:.0f} ms"):
+        st.caption(
+            f"{record['alloc_blocks']} blocks / {record['alloc_kb']} KB allocated, "
+            f"peak {record['peak_kb']} KB traced. Logged to {profiler.LOG_PATH}"
+        )
+        st.table(record["sections"])
+        st.table(record["top"])
@@ -0,0 +1,68 @@
+"""Page regions that rerun on their own
+
+Each region is an ``st.fragment``: interacting with its widgets reruns
+only that region, not the sidebar, the CSS or the rest of the page. A
+region looks up the session's store with ``get_store()`` on every run
+instead of keeping the one it was first drawn with. It declares the
+collections it reads, and records the store versions it last rendered
+with. After a write, ``changed(store)``
+reruns just the current region when every other region on screen is
+still current, or the whole app when one of them now shows stale data.
+"""
+import functools
+import threading
+
+import streamlit as st
+from streamlit.errors import StreamlitAPIException
+
+from focusflow.ui.resources import get_store
+
+_local = threading.local()
+
+
+def _seen():
+    return st.session_state.setdefault("_region_versions", {})
+
+
+def begin_run():
+    """Forget the regions of the previous full run; call at the top of the app"""
+    st.session_state["_region_versions"] = {}
+
+
+def region(name, *collections):
+    """Run the decorated fn(store, ...) as a fragment reading these collections.
+
+    Call the result without the store: fn(...) gets the current one.
+    """
+    def decorate(fn):
+        @functools.wraps(fn)
+        def body(*args, **kwargs):
+            store = get_store()
+            _seen()[name] = {c: store.versions[c] for c in collections}
+            _local.region = name
+            try:
+                return fn(store, *args, **kwargs)
+            finally:
+                _local.region = None
+        return st.fragment(body)
+    return decorate
+
+
+def stale_regions(store):
+    """Return the regions on screen, other than the current one, showing old data"""
+    here = getattr(_local, "region", None)
+    return [
+        name for name, versions in _seen().items()
+        if name != here and any(store.versions[c] != v for c, v in versions.items())
+    ]
+
+
+def changed(store):
+    """Rerun after a write, as narrowly as the regions on screen allow"""
+    if not stale_regions(store):
+        try:
+            st.rerun(scope="fragment")
+        except StreamlitAPIException:
+            # The region ran as part of a full rerun, not on its own
+            pass
+    st.rerun()
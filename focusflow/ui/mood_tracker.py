@@ -0,0 +1,131 @@
+"""Mood Tracker page"""
+import streamlit as st
+
+from focusflow.ui.fragments import changed, region
+from focusflow.ui.resources import get_figures
+from focusflow.timestamps import MINUTES_PER_DAY, format_minutes, today
+
+HISTORY_RANGES = {"Last 7 days": 7, "Last 30 days": 30, "Last 90 days": 90, "Last year": 365, "All time": None}
+HISTORY_RESOLUTIONS = {"Auto": "auto", "Raw": "raw", "Hourly": "hour", "Daily": "day", "Weekly": "week"}
+SEARCH_RESULTS = 20
+
+
+@region("mood logger")
+def mood_logger(store):
+    st.subheader("Log Your Mood")
+    
+    mood_value = st.slider(
+        "How are you feeling right now?",
+        1, 10, 5,
+        help="1 = Very Low, 10 = Excellent"
+    )
+    
+    # Mood emoji
+    mood_emoji = {
+        range(1, 3): "😢",
+        range(3, 5): "😕",
+        range(5, 7): "😐",
+        range(7, 9): "🙂",
+        range(9, 11): "😄"
+    }
+    
+    for mood_range, emoji in mood_emoji.items():
+        if mood_value in mood_range:
+            st.markdown(f"<h1 style='text-align: center;'>{emoji}</h1>", unsafe_allow_html=True)
+    
+    note = st.text_area("Add a note (optional)", placeholder="What's making you feel this way?")
+    
+    if st.button("💾 Log Mood", use_container_width=True, type="primary"):
+        store.add_mood(mood_value, note)
+        st.success("✅ Mood logged successfully!")
+        changed(store)
+
+
+@region("mood insights", "moods")
+def mood_insights(store):
+    counters = store.counters
+    
+    st.subheader("Mood Insights")
+    
+    last_mood = store.recent_moods(1)
+    if last_mood:
+        recent = last_mood[0]
+        avg_mood = counters.average_mood()
+        
+        col_a, col_b = st.columns(2)
+        with col_a:
+            st.metric("Last Mood", f"{recent['mood']}/10")
+        with col_b:
+            st.metric("Average", f"{avg_mood}/10")
+    else:
+        st.info("No mood data yet")
+
+
+@region("mood history", "moods")
+def mood_history(store):
+    st.markdown("---")
+    st.subheader("📊 Mood History")
+    
+    col_a, col_b = st.columns(2)
+    with col_a:
+        history_range = st.selectbox("Range", list(HISTORY_RANGES), index=len(HISTORY_RANGES) - 1)
+    with col_b:
+        history_resolution = st.selectbox("Resolution", list(HISTORY_RESOLUTIONS))
+    
+    # The last n calendar days, today included: the figure is rebuilt once a day, not per minute
+    days = HISTORY_RANGES[history_range]
+    since = None if days is None else (today() - days + 1) * MINUTES_PER_DAY
+    
+    # Plot (long ranges are bucketed or thinned server-side)
+    st.plotly_chart(
+        get_figures().figure(
+            "mood_history",
+            since,
+            HISTORY_RESOLUTIONS[history_resolution],
+        ),
+        use_container_width=True,
+    )
+    
+    # Recent entries
+    st.subheader("Recent Entries")
+    for mood in reversed(store.recent_moods(5)):
+        with st.expander(f"{format_minutes(mood['ts'])} - Mood: {mood['mood']}/10"):
+            if mood.get('note'):
+                st.write(mood['note'])
+            else:
+                st.write("No note")
+
+
+@region("mood search", "moods")
+def mood_search(store):
+    st.subheader("🔍 Search Notes")
+    query = st.text_input("Search your mood notes", placeholder="e.g. \"tired meet\"", label_visibility="collapsed")
+    if not query.strip():
+        return
+    
+    results = store.search_moods(query, limit=SEARCH_RESULTS)
+    if not results:
+        st.info("No notes match your search")
+    for mood in results:
+        with st.expander(f"{format_minutes(mood['ts'])} - Mood: {mood['mood']}/10"):
+            st.write(mood['note'])
+
+
+def render(store):
+    st.markdown("<h1 class='main-header'>Mood Tracker</h1>", unsafe_allow_html=True)
+    st.markdown("Track your daily mood and see patterns over time")
+    
+    st.markdown("---")
+    
+    col1, col2 = st.columns([1, 1])
+    
+    with col1:
+        mood_logger()
+    
+    with col2:
+        mood_insights()
+    
+    # Mood History
+    if store.counters.mood_count:
+        mood_history()
+        mood_search()
@@ -0,0 +1,173 @@
+"""Pick Task page"""
+from datetime import datetime
+
+import streamlit as st
+
+from focusflow.picker import priority_weight
+from focusflow.planner import Planner
+from focusflow.timestamps import MINUTES_PER_DAY, day_of, format_minutes, now_minutes
+from focusflow.ui.fragments import changed, region
+
+MODES = ["🎲 Pick one task", "🗓️ Plan my time"]
+DEFAULT_BLOCKS = "09:00-11:00, 14:00-16:30"
+
+
+def parse_blocks(text, day):
+    """Parse "HH:MM-HH:MM, ..." into sorted (start, end) epoch minutes on day"""
+    blocks = []
+    for part in text.split(","):
+        if not part.strip():
+            continue
+        start, sep, end = part.partition("-")
+        if not sep:
+            raise ValueError(f"{part.strip()!r} is not a HH:MM-HH:MM range")
+        times = []
+        for value in (start, end):
+            t = datetime.strptime(value.strip(), "%H:%M")
+            times.append(day * MINUTES_PER_DAY + t.hour * 60 + t.minute)
+        if times[1] <= times[0]:
+            raise ValueError(f"{part.strip()!r} ends before it starts")
+        blocks.append(tuple(times))
+    return sorted(blocks)
+
+
+@region("picker", "tasks")
+def picker(store):
+    counters = store.counters
+    
+    if not counters.count_tasks():
+        st.warning("⚠️ No tasks available. Add some tasks first!")
+    else:
+        col1, col2 = st.columns([2, 1])
+        
+        with col1:
+            energy_filter = st.selectbox(
+                "How's your energy level right now?",
+                ["Any", "Low energy", "High energy"],
+                help="Choose your current energy level for better task matching"
+            )
+        
+        with col2:
+            time_available = st.number_input(
+                "Time available (min)",
+                5, 300, 60, 15,
+                help="How much time do you have?"
+            )
+        
+        st.markdown("---")
+        
+        if st.button("🎲 Pick My Next Task", use_container_width=True, type="primary"):
+            # Weighted random choice based on priority, among tasks
+            # matching the energy level and time available
+            st.session_state.picked_task_id = store.picker.pick(
+                category=None if energy_filter == "Any" else energy_filter,
+                max_duration=time_available,
+            )
+            st.session_state.picked = True
+        
+        # The pick is kept by id so "Mark as Complete" still finds it on the next rerun
+        if st.session_state.get("picked"):
+            chosen = store.get_task(st.session_state.get("picked_task_id"))
+            
+            if chosen:
+                st.markdown("<div class='success-box'>", unsafe_allow_html=True)
+                st.markdown(f"## 🎯 Your Next Task:")
+                st.markdown(f"### {chosen['name']}")
+                st.markdown(f"**Duration:** {chosen['duration']} minutes")
+                st.markdown(f"**Priority:** {chosen['priority']}")
+                st.markdown(f"**Energy:** {chosen['category']}")
+                st.markdown("</div>", unsafe_allow_html=True)
+                
+                if st.button("✅ Mark as Complete", type="primary"):
+                    store.complete_task(chosen["id"])
+                    st.session_state.picked = False
+                    st.balloons()
+                    st.success("Great job! Task completed! 🎉")
+                    changed(store)
+            else:
+                st.warning("⚠️ No tasks match your current energy level and available time. Try adjusting your filters!")
+        
+        # Show available tasks
+        st.markdown("---")
+        st.subheader("Available Tasks")
+        
+        col1, col2, col3 = st.columns(3)
+        priority_counts = counters.by_priority()
+        
+        with col1:
+            st.metric("High Priority", priority_counts.get("High", 0))
+        
+        with col2:
+            st.metric("Medium Priority", priority_counts.get("Medium", 0))
+        
+        with col3:
+            st.metric("Low Priority", priority_counts.get("Low", 0))
+
+
+@region("planner", "tasks")
+def planner(store):
+    if not store.counters.count_tasks():
+        st.warning("⚠️ No tasks available. Add some tasks first!")
+        return
+    
+    col1, col2 = st.columns([2, 1])
+    with col1:
+        energy_filter = st.selectbox("How's your energy level?", ["Any", "Low energy", "High energy"])
+    with col2:
+        plan_for = st.radio("Plan", ["Time available", "Blocks today"], label_visibility="collapsed")
+    category = None if energy_filter == "Any" else energy_filter
+    plans = store.attach("planner", Planner)
+    
+    if plan_for == "Time available":
+        budget = st.number_input("Time available (min)", 5, 720, 120, 15)
+        start = now_minutes()
+        blocks = [(start, start + budget)]
+    else:
+        text = st.text_input("Free time today", DEFAULT_BLOCKS, help="Comma-separated HH:MM-HH:MM ranges")
+        try:
+            blocks = parse_blocks(text, day_of(now_minutes()))
+        except ValueError as e:
+            st.error(str(e))
+            return
+    
+    # The tasks with the highest total priority weight that fit each block
+    schedule = plans.schedule(blocks, category)
+    
+    if not schedule:
+        st.warning("⚠️ No tasks fit in that time. Try a longer budget or another energy level.")
+        return
+    
+    free = sum(end - start for start, end in blocks)
+    planned = sum(task["duration"] for _, _, task in schedule)
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Tasks planned", len(schedule))
+    col2.metric("Time used", f"{planned}/{free} min")
+    col3.metric("Priority points", sum(priority_weight(task["priority"]) for _, _, task in schedule))
+    
+    st.dataframe(
+        [
+            {
+                "Start": format_minutes(start, "%H:%M"),
+                "End": format_minutes(end, "%H:%M"),
+                "Task": task["name"],
+                "Priority": task["priority"],
+                "Energy": task["category"],
+                "Minutes": task["duration"],
+            }
+            for start, end, task in schedule
+        ],
+        hide_index=True,
+        use_container_width=True,
+    )
+
+
+def render(store):
+    st.markdown("<h1 class='main-header'>Smart Task Picker</h1>", unsafe_allow_html=True)
+    st.markdown("Let AI decide your next task based on your energy and priorities")
+    
+    st.markdown("---")
+    
+    if st.radio("Mode", MODES, horizontal=True, label_visibility="collapsed") == MODES[0]:
+        picker()
+    else:
+        planner()
@@ -0,0 +1,102 @@
+"""Process-wide resources shared by every session and page
+
+One database (and its connection pool) is opened per server process;
+each user gets a partition of it, shared by all of that user's tabs.
+Without FOCUSFLOW_USER_KEY only connections from this machine share the
+default partition; anyone else gets a partition of their own for the
+length of their browser session, as when data lived in session state.
+Session partitions live in a temporary database of their own, deleted
+when the server exits, so they never reach the real database file.
+The DataFrame and figure caches pull in pandas and Plotly, so they are
+created on the first chart drawn.
+"""
+import atexit
+import os
+import tempfile
+import uuid
+
+import streamlit as st
+
+from focusflow.storage import Database, DEFAULT_DB_PATH
+from focusflow.ui import timed_import
+
+# Where the user id comes from: "" (local connections share one partition,
+# others get one per session), "session" (one per browser session),
+# "header:<name>" (set by an authenticating proxy) or "query:<param>"
+USER_KEY = os.environ.get("FOCUSFLOW_USER_KEY", "")
+SESSION_PREFIX = "session:"
+
+
+@st.cache_resource
+def get_database(path=DEFAULT_DB_PATH):
+    """Open the SQLite database once per server process"""
+    return Database(path)
+
+
+@st.cache_resource
+def get_session_database():
+    """Open the throwaway database holding session partitions"""
+    fd, path = tempfile.mkstemp(prefix="focusflow-sessions-", suffix=".db")
+    os.close(fd)
+    db = Database(path, journal_dir="")
+    atexit.register(_remove_database, db)
+    return db
+
+
+def _remove_database(db):
+    db.close()
+    for suffix in ("", "-wal", "-shm"):
+        try:
+            os.remove(db.path + suffix)
+        except FileNotFoundError:
+            pass
+
+
+def current_user():
+    """Return the id of the user of this session, or None if it is missing"""
+    source, _, name = USER_KEY.partition(":")
+    if not source:
+        # ip_address is None for connections from localhost
+        return "" if st.context.ip_address is None else session_user()
+    if source == "session":
+        return session_user()
+    if source == "header":
+        return st.context.headers.get(name) or None
+    if source == "query":
+        return st.query_params.get(name) or None
+    raise ValueError(f"FOCUSFLOW_USER_KEY must be session, header:<name> or query:<param>, not {USER_KEY!r}")
+
+
+def session_user():
+    """Return a user id that lasts as long as this browser session"""
+    if "session_user" not in st.session_state:
+        st.session_state.session_user = SESSION_PREFIX + uuid.uuid4().hex
+    return st.session_state.session_user
+
+
+def session_only(store):
+    """Whether the store's data is reachable only from this browser session"""
+    return store.user.startswith(SESSION_PREFIX)
+
+
+def get_store(path=DEFAULT_DB_PATH):
+    """Return the current user's store, loading it on first use"""
+    user = current_user()
+    if user is None:
+        st.error("Could not tell who you are. Please sign in again.")
+        st.stop()
+    if user.startswith(SESSION_PREFIX):
+        return get_session_database().partition(user)
+    return get_database(path).partition(user)
+
+
+def get_frames(path=DEFAULT_DB_PATH):
+    """Share versioned DataFrame snapshots of the store across reruns"""
+    frames = timed_import("focusflow.frames")
+    return get_store(path).attach("frames", frames.FrameCache)
+
+
+def get_figures(path=DEFAULT_DB_PATH):
+    """Memoize Plotly figures by chart and data version"""
+    charts = timed_import("focusflow.charts")
+    return get_store(path).attach("figures", lambda store: charts.FigureCache(store, get_frames(path)))
@@ -0,0 +1,12 @@
+"""Sidebar regions"""
+import streamlit as st
+
+from focusflow.ui.fragments import region
+
+
+@region("quick stats", "tasks", "completed")
+def quick_stats(store):
+    counters = store.counters
+    st.markdown("### Quick Stats")
+    st.metric("Active Tasks", counters.count_tasks())
+    st.metric("Completed Today", counters.completed_today())
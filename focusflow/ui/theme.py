@@ -0,0 +1,69 @@
+"""Shared styling for the Streamlit pages"""
+
+CSS = """
+<style>
+    .main-header {
+        font-size: 2.5rem;
+        font-weight: 700;
+        background: linear-gradient(120deg, #6366f1, #ec4899);
+        -webkit-background-clip: text;
+        -webkit-text-fill-color: transparent;
+        margin-bottom: 0.5rem;
+    }
+    
+    .metric-card {
+        background: linear-gradient(135deg, #667eea 0%, #764ba2 100%);
+        padding: 1.5rem;
+        border-radius: 10px;
+        color: white;
+        text-align: center;
+    }
+    
+    .task-card {
+        padding: 1rem;
+        border-radius: 8px;
+        border-left: 4px solid #6366f1;
+        background-color: #f8fafc;
+        margin-bottom: 0.8rem;
+    }
+    
+    .task-card-high {
+        border-left-color: #ef4444;
+    }
+    
+    .task-card-medium {
+        border-left-color: #f59e0b;
+    }
+    
+    .task-card-low {
+        border-left-color: #10b981;
+    }
+    
+    .success-box {
+        padding: 1rem;
+        background-color: #d1fae5;
+        border-left: 4px solid #10b981;
+        border-radius: 5px;
+        margin: 1rem 0;
+    }
+    
+    .info-box {
+        padding: 1rem;
+        background-color: #dbeafe;
+        border-left: 4px solid #3b82f6;
+        border-radius: 5px;
+        margin: 1rem 0;
+    }
+    
+    div[data-testid="stMetricValue"] {
+        font-size: 2rem;
+        font-weight: 600;
+    }
+</style>
+"""
+
+
+def get_priority_color(priority):
+    """Return color for priority level"""
+    colors = {"Low": "#10b981", "Medium": "#f59e0b", "High": "#ef4444"}
+    return colors.get(priority, "#6366f1")
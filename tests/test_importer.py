@@ -0,0 +1,65 @@
+"""Telling the export layouts apart, and refusing what is not one"""
+import io
+import json
+
+import pytest
+
+from focusflow import importer
+from focusflow.exporter import export_file
+from focusflow.storage import Store
+
+TASK = {"name": "Email", "category": "Low energy", "priority": "Low", "duration": 10}
+MOOD = {"date": "2026-01-01 10:00", "mood": 5}
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = Store(str(tmp_path / "focusflow.db"))
+    yield store
+    store.close()
+
+
+def imported(store, data):
+    return importer.import_stream(store, io.BytesIO(data)).added
+
+
+def test_json_lines_with_kind_not_first(store):
+    lines = [{**TASK, "kind": "task"}, {**MOOD, "kind": "mood"}]
+    data = "".join(json.dumps(line) + "\n" for line in lines).encode()
+    assert imported(store, data) == {"tasks": 1, "moods": 1, "completed": 0}
+
+
+@pytest.mark.parametrize("indent", [None, 2])
+def test_document_on_one_or_many_lines(store, indent):
+    data = json.dumps({"tasks": [TASK], "moods": [MOOD]}, indent=indent).encode()
+    assert imported(store, data) == {"tasks": 1, "moods": 1, "completed": 0}
+
+
+@pytest.mark.parametrize("indent", [None, 2])
+def test_data_after_document_is_an_error(store, indent):
+    data = json.dumps({"tasks": [TASK]}, indent=indent).encode() + b"\n{\"tasks\": []}\n"
+    with pytest.raises(ValueError, match="unexpected data after document"):
+        imported(store, data)
+
+
+def test_malformed_file_is_not_buffered_to_the_end(store, monkeypatch):
+    monkeypatch.setattr(importer, "CHUNK_SIZE", 16)
+    reads = []
+    data = b'{"tasks": [1,, 2],\n"moods": [' + b"0, " * 10_000 + b"0]}"
+    fileobj = io.BytesIO(data)
+    read = fileobj.read
+    monkeypatch.setattr(fileobj, "read", lambda n=-1: reads.append(n) or read(n))
+    with pytest.raises(ValueError, match="Expecting value"):
+        importer.import_stream(store, fileobj)
+    assert len(reads) < 10
+
+
+@pytest.mark.parametrize("fmt", ["JSON", "JSON Lines", "JSON Lines (gzip)"])
+def test_exports_read_back_in_tiny_chunks(tmp_path, store, monkeypatch, fmt):
+    for i in range(20):
+        store.add_task(f"tâsk {i} ✓", "High energy", "High", 10 + i, created=1000 + i)
+        store.add_mood(1 + i % 10, f"nøte {i}", ts=5000 + i)
+    store.complete_task(min(task["id"] for task in store.list_tasks()), ts=9000)
+    monkeypatch.setattr(importer, "CHUNK_SIZE", 1)
+    copy = Store(str(tmp_path / "copy.db"))
+    assert imported(copy, export_file(store, fmt)) == {"tasks": 19, "moods": 20, "completed": 1}
@@ -0,0 +1,104 @@
+"""Round trips through the journal: replay and snapshot restore"""
+import pytest
+
+from focusflow import engine, journal
+from focusflow.storage import Database, Store
+
+
+def contents(store):
+    """Every stored row, ids included, in a comparable form"""
+    return sorted((collection, sorted(row.items())) for collection, row in store.iter_export())
+
+
+@pytest.fixture
+def source(tmp_path):
+    db = Database(str(tmp_path / "source.db"), journal_dir=str(tmp_path / "journal"))
+    yield db.partition("alice")
+    db.close()
+
+
+def restored(tmp_path, name="restored.db"):
+    store = Store(str(tmp_path / name), "alice")
+    engine.replay(store, str(tmp_path / "journal"), "alice")
+    return store
+
+
+def test_replay_keeps_identical_rows_apart(tmp_path, source):
+    source.add_task("Email", "Low energy", "Low", 10, created=1000)
+    second = source.add_task("Email", "Low energy", "Low", 10, created=1000)
+    source.add_mood(5, "same", ts=2000)
+    source.add_mood(5, "same", ts=2000)
+    source.complete_task(second, ts=3000)
+    source.db.close()
+
+    store = restored(tmp_path)
+    assert store.counters.completed_total == 1
+    assert store.counters.mood_count == 2
+    assert contents(store) == contents(Store(source.path, "alice"))
+
+
+def test_replay_of_every_event_kind(tmp_path, source):
+    ids = [source.add_task(f"task {i}", "High energy", "High", 20, created=100 + i) for i in range(6)]
+    source.delete_tasks(ids[:2])
+    source.complete_tasks(ids[2:4], ts=500)
+    source.insert_batch(
+        tasks=[(None, "imported", "Low energy", "Medium", 30, 50)],
+        moods=[(60, 7, "imported"), (60, 7, "imported")],
+        completed=[("done before", 70)],
+    )
+    source.clear()
+    source.add_task("after clear", "Low energy", "High", 15, created=900)
+    source.add_mood(8, "", ts=950)
+    source.db.close()
+
+    assert contents(restored(tmp_path)) == contents(Store(source.path, "alice"))
+
+
+def test_rolled_back_batch_is_not_logged(tmp_path, source):
+    source.add_mood(4, "kept", ts=10)
+    with pytest.raises(RuntimeError):
+        with source.batch():
+            source.add_mood(3, "rolled back", ts=20)
+            raise RuntimeError
+    source.db.close()
+
+    store = restored(tmp_path)
+    assert [row["note"] for row in store.list_moods()] == ["kept"]
+
+
+def test_restore_from_snapshot_and_tail(tmp_path, source, monkeypatch):
+    monkeypatch.setattr(journal, "SNAPSHOT_EVERY", 10**9)
+    for i in range(3):
+        source.add_task("Same", "Low energy", "Low", 10, created=1000)
+        source.add_mood(6, "twice", ts=2000)
+    assert source.journal.snapshot(source) is not None
+    # Logged after the snapshot: identical rows again, and a completion of a snapshotted task
+    source.add_task("Same", "Low energy", "Low", 10, created=1000)
+    source.add_mood(6, "twice", ts=2000)
+    source.complete_task(min(task["id"] for task in source.list_tasks()), ts=3000)
+    source.db.close()
+
+    events = list(journal.Journal(str(tmp_path / "journal"), "alice").events())
+    assert [event["op"] for event in events] == ["add_task", "add_mood", "complete_tasks"]
+    store = restored(tmp_path)
+    assert contents(store) == contents(Store(source.path, "alice"))
+    assert store.counters.count_tasks() == 3
+    assert store.counters.mood_count == 4
+
+
+def test_replay_leaves_the_source_untouched(tmp_path, source):
+    source.add_task("Email", "Low energy", "Low", 10, created=1000)
+    source.add_mood(5, "fine", ts=2000)
+    source.db.close()
+    log = tmp_path / "journal" / f"{journal.file_prefix('alice')}.log.jsonl"
+    with open(log, "ab") as f:
+        f.write(b'{"seq": 3, "op": "add_mo')  # torn by a crash
+    before = log.read_bytes()
+
+    store = restored(tmp_path)
+    assert store.counters.count_tasks() == 1 and store.counters.mood_count == 1
+    assert log.read_bytes() == before
+    assert not (tmp_path / "missing").exists()
+    with pytest.raises(OSError):
+        engine.replay(Store(str(tmp_path / "other.db"), "alice"), str(tmp_path / "missing"), "alice")
+    assert not (tmp_path / "missing").exists()
@@ -0,0 +1,70 @@
+"""The in-memory state of a store follows the database through rollbacks"""
+import sqlite3
+
+import pytest
+
+from focusflow.storage import Store
+
+
+def memory(store):
+    """What the store answers from memory rather than from SQLite"""
+    return (
+        sorted(store._tasks),
+        store.counters.count_tasks(),
+        store.counters.completed_total,
+        store.counters.mood_count,
+        list(store.completed.ts),
+        list(store.moods.ts),
+        store.search_tasks("email"),
+        sorted(store.mood_text.search("tired")),
+    )
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = Store(str(tmp_path / "focusflow.db"))
+    first = store.add_task("Email", "Low energy", "Low", 10, created=1000)
+    store.add_task("Email boss", "High energy", "High", 30, created=1000)
+    store.complete_task(first, ts=2000)
+    store.add_mood(4, "tired", ts=2000)
+    yield store
+    store.close()
+
+
+class FailingCommit:
+    """A connection whose commit fails, as on a full disk"""
+
+    def __init__(self, conn):
+        self._conn = conn
+
+    def commit(self):
+        raise sqlite3.OperationalError("database or disk is full")
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+
+def test_exception_inside_transaction_reloads_memory(store):
+    before = memory(store)
+    with pytest.raises(RuntimeError):
+        with store.db.transaction():
+            task_id = store.add_task("Email again", "Low energy", "Low", 5)
+            store.complete_task(task_id, ts=3000)
+            store.add_mood(2, "tired again", ts=3000)
+            store.delete_tasks(list(store._tasks))
+            raise RuntimeError
+    assert memory(store) == before
+    assert memory(store) == memory(Store(store.path))
+
+
+def test_failed_commit_reloads_memory(store):
+    before = memory(store)
+    versions = dict(store.versions)
+    conn, store.db.conn = store.db.conn, FailingCommit(store.db.conn)
+    try:
+        with pytest.raises(sqlite3.OperationalError):
+            store.add_mood(9, "tired but done", ts=3000)
+    finally:
+        store.db.conn = conn
+    assert memory(store) == before
+    assert all(store.versions[name] > versions[name] for name in versions)